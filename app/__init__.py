@@ -4,77 +4,184 @@ Flask 应用工厂模块
 使用应用工厂模式创建和配置 Flask 应用
 """
 
+import importlib
 import os
-from flask import Flask
-from flask_cors import CORS
+import threading
+
+import click
+from flask import Flask, request
+from werkzeug.exceptions import RequestEntityTooLarge
 
 from app.config import Config
 from app.util.logger import get_logger
-from app.util.db import init_db, create_tables
+from app.util.db import ensure_db_ready
+from app.util.json_provider import OrjsonProvider
+from app.util.response import error
+
+# 应用目录及模板、静态文件目录（模块导入时计算一次）
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+_TEMPLATE_DIR = os.path.join(_BASE_DIR, 'templates')
+_STATIC_DIR = os.path.join(_BASE_DIR, 'static')
+
+
+# 开发环境允许的源（不要使用 "*"）
+# 生产环境可从配置读取
+CORS_ALLOWED_ORIGINS = frozenset({
+    "http://localhost:5173",      # Vite 默认端口
+    "http://127.0.0.1:5173",
+    "http://localhost:3000",      # 备用端口
+    "http://127.0.0.1:3000",
+})
+
+# 预先拼接好的 CORS 响应头取值
+# 当前方案使用 Bearer Token，不携带凭证（不返回 Access-Control-Allow-Credentials）
+_CORS_ALLOW_METHODS = "GET, POST, PUT, DELETE, PATCH, OPTIONS"
+_CORS_ALLOW_HEADERS = "Content-Type, Authorization, X-Requested-With, Accept"
+_CORS_EXPOSE_HEADERS = "Content-Type, X-Total-Count"  # 分页总数等自定义头
+_CORS_MAX_AGE = "600"  # 预检请求缓存时间（秒）
 
 
 def configure_cors(app):
     """
     配置 CORS 跨域访问
 
+    源与响应头均为固定值，直接在请求钩子中处理：
+    预检请求直接返回 204，普通请求在响应中补充 CORS 头。
+
     Args:
         app: Flask 应用实例
     """
-    # 开发环境允许的源
-    allowed_origins = [
-        "http://localhost:5173",      # Vite 默认端口
-        "http://127.0.0.1:5173",
-        "http://localhost:3000",      # 备用端口
-        "http://127.0.0.1:3000",
-    ]
-
-    # 生产环境可从配置读取
-    # if app.config.get('CORS_ORIGINS'):
-    #     allowed_origins = app.config['CORS_ORIGINS']
-
-    CORS(
-        app,
-        # 允许的源（不要使用 "*"，尤其是当 supports_credentials=True 时）
-        origins=allowed_origins,
-        # 允许的 HTTP 方法
-        methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-        # 允许的请求头
-        allow_headers=[
-            "Content-Type",
-            "Authorization",
-            "X-Requested-With",
-            "Accept",
-        ],
-        # 允许响应头暴露给前端
-        expose_headers=[
-            "Content-Type",
-            "X-Total-Count",  # 分页总数等自定义头
-        ],
-        # 是否允许携带凭证（Cookie/Authorization）
-        # 当前方案使用 Bearer Token，设为 False 即可
-        # 如果改用 HTTP Only Cookie，需要设为 True
-        supports_credentials=False,
-        # 预检请求缓存时间（秒）
-        max_age=600,
-    )
+    @app.before_request
+    def handle_cors_preflight():
+        """处理允许源的预检请求"""
+        if request.method != 'OPTIONS' or 'Access-Control-Request-Method' not in request.headers:
+            return None
+        origin = request.headers.get('Origin')
+        if origin not in CORS_ALLOWED_ORIGINS:
+            return None
+        response = app.make_response(('', 204))
+        headers = response.headers
+        headers['Access-Control-Allow-Origin'] = origin
+        headers['Access-Control-Allow-Methods'] = _CORS_ALLOW_METHODS
+        headers['Access-Control-Allow-Headers'] = _CORS_ALLOW_HEADERS
+        headers['Access-Control-Max-Age'] = _CORS_MAX_AGE
+        headers['Vary'] = 'Origin'
+        return response
+
+    @app.after_request
+    def add_cors_headers(response):
+        """为允许源的请求补充 CORS 响应头"""
+        origin = request.headers.get('Origin')
+        if origin in CORS_ALLOWED_ORIGINS and 'Access-Control-Allow-Origin' not in response.headers:
+            headers = response.headers
+            headers['Access-Control-Allow-Origin'] = origin
+            headers['Access-Control-Expose-Headers'] = _CORS_EXPOSE_HEADERS
+            headers.add('Vary', 'Origin')
+        return response
+
+
+# 按 URL 前缀注册的业务蓝图："模块路径:蓝图变量名"（开启 LAZY_LOAD_BLUEPRINTS 时按需懒加载）
+# 同一前缀可挂载多个蓝图（文档路由与知识库路由共用 /api/kb）
+LAZY_BLUEPRINTS = {
+    '/api/auth': ('app.routes.auth:auth_bp',),
+    '/api/kb': ('app.routes.knowledgebase:kb_bp', 'app.routes.document:doc_bp'),
+    '/api/upload': ('app.routes.upload:upload_bp',),
+    '/api/settings': ('app.routes.settings:settings_bp',),
+}
+
+
+def _import_blueprint(target):
+    """按 "模块路径:蓝图变量名" 导入蓝图对象"""
+    module_name, attr = target.split(':')
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class LazyBlueprintLoader:
+    """
+    懒加载蓝图的 WSGI 包装器
+
+    首次命中某个 URL 前缀时才导入对应路由模块并注册蓝图，
+    避免应用启动时加载服务层、模型、存储等全部依赖。
+
+    注意：注册蓝图会修改 app.url_map，而其他线程可能正在用它匹配路由，锁只能串行化加载过程，
+    无法保护并发的读取方；且需要临时复位 Flask 的私有属性 _got_first_request 以绕过
+    "处理请求后禁止注册蓝图"的检查。因此仅适用于单线程场景（CLI、测试），
+    多线程（threaded 开发服务器、gunicorn gthread）或多 worker 部署必须使用默认的启动时注册。
+    """
+
+    def __init__(self, app, blueprints):
+        """
+        Args:
+            app: Flask 应用实例
+            blueprints: URL 前缀到蓝图导入路径的映射
+        """
+        if not hasattr(app, '_got_first_request'):
+            raise RuntimeError(
+                "当前 Flask 版本不提供 _got_first_request，无法懒加载蓝图，"
+                "请关闭 LAZY_LOAD_BLUEPRINTS 使用启动时注册"
+            )
+        self.app = app
+        self.wsgi_app = app.wsgi_app
+        self._pending = dict(blueprints)
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if self._pending:
+            path = environ.get('PATH_INFO', '')
+            for prefix in tuple(self._pending):
+                if path == prefix or path.startswith(prefix + '/'):
+                    self.load(prefix)
+                    break
+        return self.wsgi_app(environ, start_response)
+
+    def load(self, prefix):
+        """导入并注册指定前缀下的蓝图（仅执行一次，只能在单线程场景下使用）"""
+        with self._lock:
+            targets = self._pending.get(prefix)
+            if targets is None:
+                return
+            # Flask 在处理过请求后禁止注册蓝图，这里与 app.run() 的做法一致，临时复位该标记
+            got_first_request = self.app._got_first_request
+            self.app._got_first_request = False
+            try:
+                for target in targets:
+                    self.app.register_blueprint(_import_blueprint(target), url_prefix=prefix)
+            finally:
+                self.app._got_first_request = got_first_request
+            del self._pending[prefix]
 
 
 def register_blueprints(app):
     """
     注册所有蓝图
 
+    默认在应用创建时全部注册，处理请求期间不再修改 url_map，可安全用于多线程/多 worker 部署。
+    设置 LAZY_LOAD_BLUEPRINTS=true 时，除首页与健康检查外的蓝图改为首次请求对应前缀时再导入注册，
+    仅限单线程的 CLI/测试场景使用（见 LazyBlueprintLoader）。
+
     Args:
         app: Flask 应用实例
     """
-    from app.routes import main_bp, api_bp, auth_bp, kb_bp, upload_bp, settings_bp, doc_bp
+    from app.routes.main import main_bp
+    from app.routes.api import api_bp
 
     app.register_blueprint(main_bp)
     app.register_blueprint(api_bp, url_prefix='/api')
-    app.register_blueprint(auth_bp, url_prefix='/api/auth')
-    app.register_blueprint(kb_bp, url_prefix='/api/kb')
-    app.register_blueprint(doc_bp, url_prefix='/api/kb')  # 文档路由挂载到 /api/kb 下
-    app.register_blueprint(upload_bp, url_prefix='/api/upload')  # 修正：/api/upload 而不是 /api
-    app.register_blueprint(settings_bp, url_prefix='/api/settings')
+
+    if app.config.get('LAZY_LOAD_BLUEPRINTS'):
+        app.wsgi_app = LazyBlueprintLoader(app, LAZY_BLUEPRINTS)
+        return
+
+    for prefix, targets in LAZY_BLUEPRINTS.items():
+        for target in targets:
+            app.register_blueprint(_import_blueprint(target), url_prefix=prefix)
+
+
+# 全局模板变量（只读常量，每次渲染直接复用）
+_GLOBALS = {
+    'app_name': 'RAG Lite',
+    'app_version': '0.1.0'
+}
 
 
 def register_context_processors(app):
@@ -87,10 +194,56 @@ def register_context_processors(app):
     @app.context_processor
     def inject_globals():
         """注入全局模板变量"""
-        return {
-            'app_name': 'RAG Lite',
-            'app_version': '0.1.0'
-        }
+        return _GLOBALS
+
+
+# 不访问数据库的蓝图（首页与健康检查），请求这些路由时不触发数据库初始化
+DB_FREE_BLUEPRINTS = frozenset({'main', 'api'})
+
+
+def register_db_hooks(app):
+    """
+    注册数据库相关的钩子与命令
+
+    数据库在首个需要它的请求到来时才初始化，应用创建过程不再连接 MySQL。
+    CLI/Worker 场景可通过 `flask init-db` 显式初始化。
+
+    Args:
+        app: Flask 应用实例
+    """
+    @app.before_request
+    def init_db_on_first_use():
+        """首次访问业务接口时初始化数据库"""
+        if request.endpoint in (None, 'static', 'index') or request.blueprint in DB_FREE_BLUEPRINTS:
+            return
+        ensure_db_ready()
+
+    @app.cli.command('init-db')
+    def init_db_command():
+        """初始化数据库连接并创建数据表"""
+        ensure_db_ready()
+
+    @app.cli.command('sweep-orphan-files')
+    def sweep_orphan_files_command():
+        """重试删除此前删除失败的存储文件（可由 cron 定期执行）"""
+        from app.services.file_cleanup import sweep_orphan_files
+
+        ensure_db_ready()
+        count = sweep_orphan_files()
+        click.echo(f"已清理 {count} 个待删除文件")
+
+
+def register_error_handlers(app):
+    """
+    注册全局错误处理
+
+    Args:
+        app: Flask 应用实例
+    """
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_request_too_large(e):
+        """请求体超过 MAX_CONTENT_LENGTH 时返回统一格式的 413 响应"""
+        return error("上传内容大小超过限制", 413)
 
 
 def create_app(config_class=Config):
@@ -106,26 +259,19 @@ def create_app(config_class=Config):
     # 获取日志记录器
     logger = get_logger(__name__)
 
-    # 初始化数据库
-    try:
-        logger.info("初始化数据库...")
-        init_db()
-        create_tables()
-        logger.info("初始化数据库成功")
-    except Exception as e:
-        logger.warning(f"数据库初始化失败: {e}")
-
     # 创建 Flask 应用对象
-    base_dir = os.path.abspath(os.path.dirname(__file__))
     app = Flask(
         __name__,
-        template_folder=os.path.join(base_dir, 'templates'),
-        static_folder=os.path.join(base_dir, 'static')
+        template_folder=_TEMPLATE_DIR,
+        static_folder=_STATIC_DIR
     )
 
     # 加载配置
     app.config.from_object(config_class)
 
+    # 使用 orjson 进行 JSON 编解码
+    app.json = OrjsonProvider(app)
+
     # 配置 CORS 跨域
     configure_cors(app)
 
@@ -135,6 +281,12 @@ def create_app(config_class=Config):
     # 注册上下文处理器
     register_context_processors(app)
 
+    # 注册错误处理
+    register_error_handlers(app)
+
+    # 数据库延迟到首次需要时初始化
+    register_db_hooks(app)
+
     # 首页路由
     @app.route('/')
     def index():
@@ -4,13 +4,39 @@
 
 # 导入操作系统相关模块
 import os
+# 导入 NamedTuple，定义不可变的功能开关
+from typing import NamedTuple
 # 导入 Path，处理路径
 from pathlib import Path
 # 导入 dotenv，用于加载 .env 文件中的环境变量
 from dotenv import load_dotenv
 
-# 加载 .env 文件中的环境变量到系统环境变量
-load_dotenv()
+# 加载 .env 文件中的环境变量到系统环境变量（不覆盖已存在的变量）
+# 以环境变量作为已加载标记，子进程/fork 出的 worker 继承后不再重复读取 .env
+_DOTENV_SENTINEL = '_RAG_LITE_DOTENV_LOADED'
+if _DOTENV_SENTINEL not in os.environ:
+    load_dotenv(override=False, verbose=False)
+    os.environ[_DOTENV_SENTINEL] = '1'
+
+# 环境变量快照：一次性复制，后续读取均为普通字典查找
+_ENV = dict(os.environ)
+
+# 视为 True 的布尔配置取值
+_TRUE_VALUES = frozenset({'true', '1', 'yes', 'on'})
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """读取布尔型环境变量，未设置时返回默认值"""
+    value = _ENV.get(name)
+    if value is None:
+        return default
+    return value in _TRUE_VALUES or value.lower() in _TRUE_VALUES
+
+
+def _env_int(name: str, default: int) -> int:
+    """读取整型环境变量，未设置时返回默认值"""
+    value = _ENV.get(name)
+    return default if value is None else int(value)
 
 
 class Config:
@@ -19,65 +45,109 @@ class Config:
     # 项目根目录路径（取上级目录）
     BASE_DIR = Path(__file__).parent.parent
     # 加载环境变量 SECRET_KEY，若未设置则使用默认开发密钥
-    SECRET_KEY = os.environ.get(
-        'SECRET_KEY') or 'dev-secret-key-change-in-production'
+    SECRET_KEY = _ENV.get('SECRET_KEY') or 'dev-secret-key-change-in-production'
 
     # 应用配置
     # 读取应用监听的主机地址，默认为本地所有地址
-    APP_HOST = os.environ.get('APP_HOST', '0.0.0.0')
+    APP_HOST = _ENV.get('APP_HOST', '0.0.0.0')
     # 读取应用监听的端口，默认为 5000，类型为 int
-    APP_PORT = int(os.environ.get('APP_PORT', 5000))
-    # 读取 debug 模式配置，字符串转小写等于 'true' 则为 True（开启调试）
-    APP_DEBUG = os.environ.get('APP_DEBUG', 'false').lower() == 'true'
+    APP_PORT = _env_int('APP_PORT', 5000)
+    # 读取 debug 模式配置，取值为 true/1/yes/on 时开启调试
+    APP_DEBUG = _env_bool('APP_DEBUG', False)
     # 读取允许上传的最大文件大小，默认为 100MB，类型为 int
-    MAX_FILE_SIZE = int(os.environ.get('MAX_FILE_SIZE', 104857600))  # 100MB
-    # 允许上传的文件扩展名集合
-    ALLOWED_EXTENSIONS = {'pdf', 'docx', 'txt', 'md'}
+    MAX_FILE_SIZE = _env_int('MAX_FILE_SIZE', 104857600)  # 100MB
+    # 请求体大小上限：文件上限再预留 1MB 给 multipart 表单开销，超出时直接返回 413
+    MAX_CONTENT_LENGTH = MAX_FILE_SIZE + 1024 * 1024
+    # 是否按需懒加载业务蓝图（默认启动时全部注册；懒加载会在请求期间修改路由表，仅限单线程的 CLI/测试使用）
+    LAZY_LOAD_BLUEPRINTS = _env_bool('LAZY_LOAD_BLUEPRINTS', False)
+    # 允许上传的文件扩展名集合（小写，不可变）
+    ALLOWED_EXTENSIONS = frozenset({'pdf', 'docx', 'txt', 'md'})
+
+    # 密码哈希配置
+    # 新密码使用的哈希算法：'bcrypt'（默认）或 'argon2'（需安装 argon2-cffi）；
+    # 校验时按已存储哈希的前缀识别算法，切换后旧密码仍可登录
+    PASSWORD_HASHER = _ENV.get('PASSWORD_HASHER', 'bcrypt').lower()
+    # bcrypt 成本因子，每加 1 耗时翻倍；已存储的哈希自带成本因子，修改不影响旧密码校验
+    BCRYPT_ROUNDS = _env_int('BCRYPT_ROUNDS', 10)
 
     # 日志配置
     # 日志目录，默认 './logs'
-    LOG_DIR = os.environ.get('LOG_DIR', './logs')
+    LOG_DIR = _ENV.get('LOG_DIR', './logs')
     # 日志文件名，默认 'rag_lite.log'
-    LOG_FILE = os.environ.get('LOG_FILE', 'rag_lite.log')
+    LOG_FILE = _ENV.get('LOG_FILE', 'rag_lite.log')
     # 日志等级，默认 'INFO'
-    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_LEVEL = _ENV.get('LOG_LEVEL', 'INFO')
     # 是否启用控制台日志，默认 True
-    LOG_ENABLE_CONSOLE = os.environ.get(
-        'LOG_ENABLE_CONSOLE', 'true').lower() == 'true'
+    LOG_ENABLE_CONSOLE = _env_bool('LOG_ENABLE_CONSOLE', True)
     # 是否启用文件日志，默认 True
-    LOG_ENABLE_FILE = os.environ.get(
-        'LOG_ENABLE_FILE', 'true').lower() == 'true'
+    LOG_ENABLE_FILE = _env_bool('LOG_ENABLE_FILE', True)
 
-    DB_HOST = os.environ.get("DB_HOST", "localhost")  # 数据库主机
-    DB_PORT = os.environ.get("DB_PORT", 3306)  # 数据库端口
-    DB_USER = os.environ.get("DB_USER", "root")  # 数据库用户
-    DB_PASSWORD = os.environ.get("DB_PASSWORD", "")  # 数据库密码（请通过环境变量配置）
-    DB_NAME = os.environ.get("DB_NAME", "rag-lite")  # 数据库名
-    DB_CHARSET = os.environ.get("DB_CHARSET", "utf8mb4")
+    DB_HOST = _ENV.get("DB_HOST", "localhost")  # 数据库主机
+    DB_PORT = _ENV.get("DB_PORT", 3306)  # 数据库端口
+    DB_USER = _ENV.get("DB_USER", "root")  # 数据库用户
+    DB_PASSWORD = _ENV.get("DB_PASSWORD", "")  # 数据库密码（请通过环境变量配置）
+    DB_NAME = _ENV.get("DB_NAME", "rag-lite")  # 数据库名
+    DB_CHARSET = _ENV.get("DB_CHARSET", "utf8mb4")
+    # MySQL 驱动：pymysql（纯 Python，默认）或 mysqldb（mysqlclient，C 扩展，需额外安装）
+    DB_DRIVER = _ENV.get("DB_DRIVER", "pymysql")
+    # 连接池配置：每个 worker 进程独立一个连接池，单进程最多占用 DB_POOL_SIZE + DB_MAX_OVERFLOW 个连接。
+    # 必须满足 worker 数 × (DB_POOL_SIZE + DB_MAX_OVERFLOW) < MySQL max_connections（默认 151），
+    # 默认值按固定 9 个 worker 核算：9 × (5 + 5) = 90 个连接；增加 worker 数时需相应调小，
+    # 不要让 worker 数随 CPU 核数增长（如 8 核 2*nproc+1 = 17 个 worker 时共 170 个连接，超过上限）。
+    # 默认值按单进程的并发数据库使用者估算：gthread 请求线程（4）+ 文档处理线程（4），
+    # 后台任务线程偶尔用到数据库，连接不足时在 DB_POOL_TIMEOUT 内等待归还
+    DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)  # 连接池常驻连接数
+    DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 5)  # 最大溢出连接数
+    DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)  # 获取连接超时时间(秒)
+    DB_POOL_RECYCLE = _env_int("DB_POOL_RECYCLE", 1800)  # 连接回收时间(秒)
+    DB_ECHO = _env_bool("DB_ECHO", False)  # 是否输出 SQL 日志（调试用）
 
     # 存储配置
-    STORAGE_TYPE = os.environ.get('STORAGE_TYPE', 'local')  # 'local' or 'minio'
+    STORAGE_TYPE = _ENV.get('STORAGE_TYPE', 'local')  # 'local' or 'minio'
 
     # 本地存储配置
-    LOCAL_UPLOAD_DIR = os.environ.get('LOCAL_UPLOAD_DIR', './uploads')
+    LOCAL_UPLOAD_DIR = _ENV.get('LOCAL_UPLOAD_DIR', './uploads')
 
     # MinIO 配置
-    MINIO_ENDPOINT = os.environ.get('MINIO_ENDPOINT', 'localhost:9000')
-    MINIO_ACCESS_KEY = os.environ.get('MINIO_ACCESS_KEY', '')
-    MINIO_SECRET_KEY = os.environ.get('MINIO_SECRET_KEY', '')
-    MINIO_BUCKET = os.environ.get('MINIO_BUCKET', 'rag-lite')
-    MINIO_SECURE = os.environ.get('MINIO_SECURE', 'false').lower() == 'true'
+    MINIO_ENDPOINT = _ENV.get('MINIO_ENDPOINT', 'localhost:9000')
+    MINIO_ACCESS_KEY = _ENV.get('MINIO_ACCESS_KEY', '')
+    MINIO_SECRET_KEY = _ENV.get('MINIO_SECRET_KEY', '')
+    MINIO_BUCKET = _ENV.get('MINIO_BUCKET', 'rag-lite')
+    MINIO_SECURE = _env_bool('MINIO_SECURE', False)
+    # MinIO 客户端每个进程保持的最大空闲连接数（SDK 默认 10，并发上传时超出的连接用完即关闭）
+    MINIO_POOL_MAXSIZE = _env_int('MINIO_POOL_MAXSIZE', 64)
+    # 分片上传时并行上传（含分片校验和计算）的线程数（SDK 默认 3）
+    MINIO_PARALLEL_UPLOADS = _env_int('MINIO_PARALLEL_UPLOADS', 4)
 
     # 图片上传配置
-    MAX_IMAGE_SIZE = int(os.environ.get('MAX_IMAGE_SIZE', 5242880))  # 5MB
-    ALLOWED_IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp'}
+    MAX_IMAGE_SIZE = _env_int('MAX_IMAGE_SIZE', 5242880)  # 5MB
+    ALLOWED_IMAGE_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'gif', 'webp'})
 
     # 向量存储配置
-    VECTOR_STORE_TYPE = os.environ.get('VECTOR_STORE_TYPE', 'chroma')  # 'chroma' or 'milvus'
+    VECTOR_STORE_TYPE = _ENV.get('VECTOR_STORE_TYPE', 'chroma')  # 'chroma' or 'milvus'
 
     # Chroma 配置
-    CHROMA_PERSIST_DIR = os.environ.get('CHROMA_PERSIST_DIR', './data/chroma')
+    CHROMA_PERSIST_DIR = _ENV.get('CHROMA_PERSIST_DIR', './data/chroma')
 
     # Milvus 配置
-    MILVUS_HOST = os.environ.get('MILVUS_HOST', 'localhost')
-    MILVUS_PORT = os.environ.get('MILVUS_PORT', '19530')
\ No newline at end of file
+    MILVUS_HOST = _ENV.get('MILVUS_HOST', 'localhost')
+    MILVUS_PORT = _ENV.get('MILVUS_PORT', '19530')
+
+
+class Features(NamedTuple):
+    """运行期功能开关（启动时确定，之后不可变）"""
+
+    # 是否开启调试模式
+    debug: bool
+    # 是否启用控制台日志
+    log_console: bool
+    # 是否启用文件日志
+    log_file: bool
+
+
+# 由已解析的配置构建一次，供日志、启动入口等直接引用
+FEATURES = Features(
+    debug=Config.APP_DEBUG,
+    log_console=Config.LOG_ENABLE_CONSOLE,
+    log_file=Config.LOG_ENABLE_FILE,
+)
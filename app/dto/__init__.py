@@ -0,0 +1,9 @@
+"""
+数据传输对象模块
+
+集中定义请求参数的解析与校验
+"""
+
+from app.dto.kb import KbCreateDTO
+
+__all__ = ["KbCreateDTO"]
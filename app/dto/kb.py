@@ -0,0 +1,152 @@
+"""
+知识库请求参数模块
+
+知识库字段的校验规则只在这里定义一次，创建和更新接口共用；
+数据库层的 CHECK 约束（见 Knowledgebase 模型）与这里的范围保持一致。
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+# 知识库名称最大长度
+NAME_MAX_LENGTH = 128
+
+# 整数字段的声明式校验规则：字段 -> (最小值, 最大值, 错误信息)
+INT_FIELD_RULES = {
+    "chunk_size": (100, 2000, "分块大小应为 100-2000 之间的整数"),
+    "chunk_overlap": (0, 200, "分块重叠大小应为 0-200 之间的整数"),
+}
+
+
+def validate_name(name: Any) -> Tuple[Optional[str], Optional[str]]:
+    """
+    校验并清理知识库名称
+
+    Returns:
+        (清理后的名称, 错误信息)
+    """
+    name = name.strip() if isinstance(name, str) else ""
+    if not name:
+        return None, "知识库名称不能为空"
+    if len(name) > NAME_MAX_LENGTH:
+        return None, "知识库名称不能超过 128 个字符"
+    return name, None
+
+
+def validate_int_field(field: str, value: Any) -> Optional[str]:
+    """按 INT_FIELD_RULES 校验整数字段（布尔值不视为整数），通过时返回 None"""
+    minimum, maximum, message = INT_FIELD_RULES[field]
+    if type(value) is not int or not minimum <= value <= maximum:
+        return message
+    return None
+
+
+def clean_description(description: Any) -> Optional[str]:
+    """清理描述，空字符串视为未填写"""
+    return (description.strip() or None) if isinstance(description, str) else None
+
+
+def _parse_description(value: Any) -> Tuple[Optional[str], Optional[str]]:
+    return clean_description(value), None
+
+
+def _parse_chunk_size(value: Any) -> Tuple[Any, Optional[str]]:
+    return value, validate_int_field("chunk_size", value)
+
+
+def _parse_chunk_overlap(value: Any) -> Tuple[Any, Optional[str]]:
+    return value, validate_int_field("chunk_overlap", value)
+
+
+def _parse_passthrough(value: Any) -> Tuple[Any, Optional[str]]:
+    return value, None
+
+
+# 允许更新的字段及其解析函数：字段 -> (清理后的值, 错误信息)
+UPDATE_FIELDS = (
+    ("name", validate_name),
+    ("description", _parse_description),
+    ("chunk_size", _parse_chunk_size),
+    ("chunk_overlap", _parse_chunk_overlap),
+    ("cover_image", _parse_passthrough),
+)
+
+
+def parse_update(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    按 UPDATE_FIELDS 解析更新知识库的请求体，只处理请求中出现的字段
+
+    chunk_size 与 chunk_overlap 同时更新时在这里校验两者关系；
+    只更新其中一个时，需要在 Service 层结合数据库现有值进行校验。
+
+    Args:
+        data: 请求体字典
+
+    Returns:
+        (更新字段字典, 错误信息)
+    """
+    update_data = {}
+    for field, parse in UPDATE_FIELDS:
+        if field in data:
+            value, error = parse(data[field])
+            if error:
+                return None, error
+            update_data[field] = value
+
+    if "chunk_size" in update_data and "chunk_overlap" in update_data:
+        if update_data["chunk_overlap"] >= update_data["chunk_size"]:
+            return None, "分块重叠大小不能大于等于分块大小"
+
+    return update_data, None
+
+
+@dataclass(slots=True)
+class KbCreateDTO:
+    """创建知识库的请求参数"""
+
+    name: str
+    chunk_size: int
+    chunk_overlap: int
+    description: Optional[str] = None
+    cover_image: Optional[str] = None
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> Tuple[Optional["KbCreateDTO"], Optional[str]]:
+        """
+        从请求 JSON 构建并一次性完成全部校验
+
+        Args:
+            data: 请求体字典
+
+        Returns:
+            (DTO, 错误信息)
+        """
+        name, error = validate_name(data.get("name"))
+        if error:
+            return None, error
+
+        chunk_size = data.get("chunk_size")
+        if chunk_size is None:
+            return None, "分块大小不能为空"
+        error = validate_int_field("chunk_size", chunk_size)
+        if error:
+            return None, error
+
+        chunk_overlap = data.get("chunk_overlap")
+        if chunk_overlap is None:
+            return None, "分块重叠大小不能为空"
+        error = validate_int_field("chunk_overlap", chunk_overlap)
+        if error:
+            return None, error
+
+        if chunk_overlap >= chunk_size:
+            return None, "分块重叠大小不能大于等于分块大小"
+
+        return cls(
+            name=name,
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            description=clean_description(data.get("description")),
+            cover_image=data.get("cover_image"),  # 预留字段
+        ), None
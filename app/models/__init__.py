@@ -3,5 +3,6 @@ from app.models.user import User
 from app.models.knowledgebase import Knowledgebase
 from app.models.settings import Settings
 from app.models.document import Document, DocumentStatus
+from app.models.orphan_file import OrphanFile
 
-__all__ = ["Base", "BaseModel", "User", "Knowledgebase", "Settings", "Document", "DocumentStatus"]
+__all__ = ["Base", "BaseModel", "User", "Knowledgebase", "Settings", "Document", "DocumentStatus", "OrphanFile"]
@@ -5,6 +5,7 @@
 提供所有模型的通用字段和方法
 """
 
+from sqlalchemy import Date, DateTime
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.inspection import inspect
 
@@ -12,31 +13,57 @@ from sqlalchemy.inspection import inspect
 # 创建统一的Base类，所有ORM模型都应继承自该Base
 Base = declarative_base()
 
+def _identity(value):
+    return value
+
+
+def _isoformat(value):
+    # 日期类型的值调用isoformat转换为字符串
+    return value.isoformat() if value else None
+
+
+def _make_serializer(column_type):
+    # 根据列类型选择序列化函数，只在构建缓存时判断一次
+    if isinstance(column_type, (DateTime, Date)):
+        return _isoformat
+    return _identity
+
+
 # 定义所有的模型的基类
 class BaseModel(Base):
     # 把此类标准为抽象类，这样就不会创建表了
     __abstract__ = True
 
     # 把模型对象转成python字典的方法
-    def to_dict(self, exclude=[], **kwargs):
+    def to_dict(self, exclude=(), **kwargs):
         # 要排除的字段列表 ["password_hash"]
-        result = {}
-        # 获取当模型类的所有的列定义
-        mapper = inspect(self.__class__)
-        # 遍历所有的列
-        for column in mapper.columns:
-            # 获取列名
-            col_name = column.name
-            if col_name in exclude:
-                continue
-            # 获取此字段名的值
-            value = getattr(self, col_name, None)
-            # 如果value有是日期类型的话，调用isoformat转换为字符串
-            if hasattr(value, "isoformat"):
-                result[col_name] = value.isoformat() if value else None
-            else:
-                result[col_name] = value
-        return result
+        return {
+            name: serialize(getattr(self, name, None))
+            for name, serialize in self._column_serializers()
+            if name not in exclude
+        }
+
+    # 把查询结果行（列名到值的映射）转成python字典的方法，与to_dict输出一致
+    @classmethod
+    def row_to_dict(cls, row, exclude=()):
+        return {
+            name: serialize(row[name])
+            for name, serialize in cls._column_serializers()
+            if name not in exclude and name in row
+        }
+
+    @classmethod
+    def _column_serializers(cls):
+        # 每个模型类只反射一次列定义，缓存 (列名, 序列化函数) 元组
+        # 映射在类创建完成后才生效，因此在首次使用时构建并保存到当前类上
+        serializers = cls.__dict__.get("_COLUMN_SERIALIZERS")
+        if serializers is None:
+            serializers = tuple(
+                (column.name, _make_serializer(column.type))
+                for column in inspect(cls).columns
+            )
+            cls._COLUMN_SERIALIZERS = serializers
+        return serializers
 
     def __repr__(self):
         # 如果子类指定义__repr_fields__值，优先显示这些字段
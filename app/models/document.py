@@ -4,9 +4,9 @@
 用于存储知识库中的文档信息
 """
 
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, BigInteger
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, BigInteger, Index
 from sqlalchemy.sql import func
-import uuid
+from app.util.ids import generate_id
 
 from app.models.base import BaseModel
 
@@ -22,9 +22,16 @@ class Document(BaseModel):
     
     # 指定 __repr__ 显示的字段
     __repr_fields__ = ["id", "name", "status"]
+
+    __table_args__ = (
+        # 同一知识库内按文件内容哈希查重
+        Index("ix_document_kb_id_file_hash", "kb_id", "file_hash"),
+        # 文档列表按 (created_at, id) 倒序的游标分页
+        Index("ix_document_kb_id_created_at_id", "kb_id", "created_at", "id"),
+    )
     
     # 主键，32位UUID
-    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex[:32])
+    id = Column(String(32), primary_key=True, default=generate_id)
     
     # 知识库外键，级联删除
     kb_id = Column(
@@ -45,6 +52,10 @@ class Document(BaseModel):
     
     # 文件大小（字节）
     file_size = Column(BigInteger, nullable=False)
+
+    # 文件内容 SHA-256 摘要（十六进制），用于同一知识库内上传去重
+    # 已有库由 upgrade_schema（flask init-db / 首次初始化数据库时执行）自动补齐该列及索引
+    file_hash = Column(String(64), nullable=True)
     
     # 文档状态: pending（待处理）, processing（处理中）, completed（已完成）, failed（失败）
     status = Column(String(32), nullable=False, default='pending')
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, Text, ForeignKey, CheckConstraint, Index
 from sqlalchemy.sql import func
-import uuid
+from app.util.ids import generate_id
 from app.models.base import BaseModel
 
 
@@ -9,7 +9,20 @@ class Knowledgebase(BaseModel):
     __tablename__ = "knowledgebase"
     # 指定__repr__显示的字段
     __repr_fields__ = ["id", "name"]
-    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex[:32])
+    # 分块参数的取值范围与 app/dto/kb.py 中的校验规则一致，由数据库兜底保证
+    # 已有库需手动执行: ALTER TABLE knowledgebase
+    #   ADD CONSTRAINT ck_knowledgebase_chunk_size CHECK (chunk_size BETWEEN 100 AND 2000),
+    #   ADD CONSTRAINT ck_knowledgebase_chunk_overlap CHECK (chunk_overlap BETWEEN 0 AND 200),
+    #   ADD CONSTRAINT ck_knowledgebase_chunk_overlap_lt_size CHECK (chunk_overlap < chunk_size);
+    __table_args__ = (
+        # 知识库列表按 (created_at, id) 倒序的游标分页
+        # 已有库由 upgrade_schema 自动创建该索引
+        Index("ix_knowledgebase_user_id_created_at_id", "user_id", "created_at", "id"),
+        CheckConstraint("chunk_size BETWEEN 100 AND 2000", name="ck_knowledgebase_chunk_size"),
+        CheckConstraint("chunk_overlap BETWEEN 0 AND 200", name="ck_knowledgebase_chunk_overlap"),
+        CheckConstraint("chunk_overlap < chunk_size", name="ck_knowledgebase_chunk_overlap_lt_size"),
+    )
+    id = Column(String(32), primary_key=True, default=generate_id)
     # 定义用户ID，外键关联到user表的id,删除用户时级联删除，不能为空，并且建有索引
     user_id = Column(
         String(32),
@@ -0,0 +1,37 @@
+"""
+待清理文件模型
+
+记录数据库中已删除、但存储文件尚未删除的 object_key，
+与业务记录的删除在同一事务中写入，文件删除成功后移除，失败的由清理命令按退避时间重试
+"""
+
+from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy.sql import func
+from app.util.ids import generate_id
+
+from app.models.base import BaseModel
+
+
+class OrphanFile(BaseModel):
+    """待清理文件模型"""
+
+    # 指定数据库表名
+    __tablename__ = "orphan_file"
+
+    # 指定 __repr__ 显示的字段
+    __repr_fields__ = ["id", "object_key"]
+
+    # 记录 ID（32位十六进制字符串）
+    id = Column(String(32), primary_key=True, default=generate_id)
+
+    # 待删除文件的存储路径（object_key）
+    object_key = Column(String(512), nullable=False, index=True)
+
+    # 创建时间
+    created_at = Column(DateTime, default=func.now(), index=True)
+
+    # 已失败的删除次数
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # 下次允许重试的时间（为空表示尚未失败过），清理命令跳过未到时间的记录
+    next_attempt_at = Column(DateTime, nullable=True, index=True)
@@ -2,14 +2,14 @@
 from sqlalchemy import Column, String, DateTime, Boolean
 from app.models.base import BaseModel
 from sqlalchemy.sql import func
-import uuid
+from app.util.ids import generate_id
 
 
 class User(BaseModel):
     """用户模型类"""
 
     __tablename__ = "user"
-    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex[:32])
+    id = Column(String(32), primary_key=True, default=generate_id)
     # 用户名
     username = Column(String(64), nullable=False, unique=True, index=True)
     # username: Mapped[str] = mapped_column(String(100), nullable=False)
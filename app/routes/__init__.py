@@ -1,15 +1,26 @@
 """
 路由包
 
-包含所有蓝图模块
+包含所有蓝图模块，蓝图在首次访问时才导入对应模块
 """
 
-from app.routes.main import main_bp
-from app.routes.api import api_bp
-from app.routes.auth import auth_bp
-from app.routes.knowledgebase import kb_bp
-from app.routes.upload import upload_bp
-from app.routes.settings import settings_bp
-from app.routes.document import doc_bp
+import importlib
 
-__all__ = ['main_bp', 'api_bp', 'auth_bp', 'kb_bp', 'upload_bp', 'settings_bp', 'doc_bp']
+_BLUEPRINT_MODULES = {
+    'main_bp': 'app.routes.main',
+    'api_bp': 'app.routes.api',
+    'auth_bp': 'app.routes.auth',
+    'kb_bp': 'app.routes.knowledgebase',
+    'upload_bp': 'app.routes.upload',
+    'settings_bp': 'app.routes.settings',
+    'doc_bp': 'app.routes.document',
+}
+
+__all__ = list(_BLUEPRINT_MODULES)
+
+
+def __getattr__(name):
+    module_name = _BLUEPRINT_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
@@ -4,17 +4,23 @@ API 路由模块
 提供 RESTful API 接口
 """
 
-from flask import Blueprint, jsonify, request
+import orjson
+from flask import Blueprint, Response
+
+from app.util.json_provider import OrjsonProvider
 
 # 创建 API 蓝图
 api_bp = Blueprint('api', __name__)
 
+# 健康检查的响应体固定不变，导入时按应用 JSON Provider 相同的 orjson 选项序列化一次
+# 每次请求仍创建新的 Response，避免 after_request 钩子修改共享的响应头
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'message': 'RAG Lite API is running'
+}, option=OrjsonProvider.OPTIONS)
+
 
 @api_bp.route('/health')
 def health_check():
     """健康检查接口"""
-    return jsonify({
-        'status': 'healthy',
-        'message': 'RAG Lite API is running'
-    })
-
+    return Response(_HEALTH_BODY, mimetype='application/json')
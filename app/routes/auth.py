@@ -68,7 +68,7 @@ def register():
     if error:
         return bad_request(error)
 
-    logger.info(f"新用户注册: {username}")
+    logger.info("新用户注册: %s", username)
 
     return success(
         data=user_data,
@@ -118,7 +118,7 @@ def login():
         username=user.username
     )
 
-    logger.info(f"用户登录: {username}")
+    logger.info("用户登录: %s", username)
 
     return success(
         data=user.to_dict(),
@@ -170,7 +170,7 @@ def logout():
     current_user = get_current_user()
     username = current_user.get("username", "unknown") if current_user else "unknown"
 
-    logger.info(f"用户登出: {username}")
+    logger.info("用户登出: %s", username)
 
     # TODO: 如需实现 Token 黑名单，在此添加逻辑
     # 例如：将当前 Token 加入 Redis 黑名单
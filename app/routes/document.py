@@ -4,31 +4,38 @@
 提供文档的上传、查询、删除、处理等 API 接口
 """
 
+import os
+
 from flask import Blueprint, request
 
 from app.services.document_service import doc_service
-from app.services.storage import get_storage_provider
-from app.services.document_processor import document_processor
 from app.services.vector_store.factory import get_vector_store
 from app.services.settings_service import settings_service
+from app.services.storage import get_storage_provider
 from app.services.embedding.factory import get_embedding
 from app.util.auth import login_required, get_current_user_id
 from app.util.response import success, bad_request, not_found, server_error
-from app.util.file_validator import validate_document_file, sanitize_filename
+from app.util.file_validator import validate_document_file, sanitize_filename, compute_file_hash
 from app.util.logger import get_logger
-import re
+from app.util.pagination import decode_cursor
 
 
 logger = get_logger(__name__)
 
 
-# ID 格式校验正则（32位十六进制字符串）
-ID_PATTERN = re.compile(r'^[a-f0-9]{32}$')
+def _get_document_processor():
+    """延迟加载文档处理器，首次提交处理任务时才导入并创建线程池"""
+    from app.services.document_processor import document_processor
+    return document_processor
+
+
+# ID 允许的字符（小写十六进制）
+_HEX_CHARS = frozenset('0123456789abcdef')
 
 
 def is_valid_id(id_str: str) -> bool:
     """校验 ID 是否为有效的 32 位 hex 字符串"""
-    return bool(id_str and ID_PATTERN.match(id_str))
+    return isinstance(id_str, str) and len(id_str) == 32 and _HEX_CHARS.issuperset(id_str)
 
 
 # 创建文档蓝图
@@ -71,25 +78,31 @@ def upload_document(kb_id):
     # 校验文件
     is_valid, error_msg, file_size, file_type = validate_document_file(file)
     if not is_valid:
-        logger.warning(f"文档校验失败: {error_msg}")
+        logger.warning("文档校验失败: %s", error_msg)
         return bad_request(error_msg)
 
+    # 获取当前用户 ID
+    user_id = get_current_user_id()
+
+    # 计算文件内容摘要，同一知识库内不重复存储相同文件
+    file_hash = compute_file_hash(file)
+    duplicate, error = doc_service.find_by_hash(kb_id, user_id, file_hash)
+    if error:
+        return bad_request(error)
+    if duplicate:
+        return bad_request(f"知识库中已存在相同内容的文档: {duplicate['name']}")
+
     # 清理文件名
     safe_filename = sanitize_filename(file.filename)
 
-    # 文档名称：优先使用用户自定义名称，否则使用清理后的文件名（不含扩展名）
-    if custom_name:
-        doc_name = custom_name
-    else:
-        # 去掉扩展名作为文档名称
-        import os
-        doc_name = os.path.splitext(safe_filename)[0]
+    # 文档名称：优先使用用户自定义名称，否则使用清理后的文件名（去掉扩展名）
+    doc_name = custom_name or os.path.splitext(safe_filename)[0]
 
     # 获取存储提供者
     try:
         storage = get_storage_provider()
     except Exception as e:
-        logger.error(f"获取存储提供者失败: {e}")
+        logger.error("获取存储提供者失败: %s", e)
         return server_error("存储服务初始化失败")
 
     # 上传文件到存储
@@ -102,12 +115,9 @@ def upload_document(kb_id):
     )
 
     if upload_error:
-        logger.error(f"文件上传失败: {upload_error}")
+        logger.error("文件上传失败: %s", upload_error)
         return server_error(f"文件上传失败: {upload_error}")
 
-    # 获取当前用户 ID
-    user_id = get_current_user_id()
-
     # 创建文档记录
     doc_data, error = doc_service.create(
         kb_id=kb_id,
@@ -115,19 +125,20 @@ def upload_document(kb_id):
         name=doc_name,
         file_path=object_key,
         file_type=file_type,
-        file_size=file_size
+        file_size=file_size,
+        file_hash=file_hash
     )
 
     if error:
         # 创建记录失败，删除已上传的文件
         try:
             storage.delete(object_key)
-            logger.info(f"回滚删除已上传的文件: {object_key}")
+            logger.info("回滚删除已上传的文件: %s", object_key)
         except Exception as del_err:
-            logger.error(f"回滚删除文件失败: {object_key}, 错误: {del_err}")
+            logger.error("回滚删除文件失败: %s, 错误: %s", object_key, del_err)
         return bad_request(error)
 
-    logger.info(f"用户 {user_id} 上传文档到知识库 {kb_id}: {doc_name}")
+    logger.info("用户 %s 上传文档到知识库 %s: %s", user_id, kb_id, doc_name)
 
     return success(data=doc_data, message="上传成功")
 
@@ -142,30 +153,35 @@ def get_documents(kb_id):
         kb_id: 知识库 ID
 
     Query Params:
-        page: 页码（默认 1）
         page_size: 每页数量（默认 10）
+        cursor: 分页游标（取上一页返回的 next_cursor，第一页不传）
+        page: 页码（可选，传入时使用页码分页）
+        with_total: 页码分页时是否返回总数（true/1，默认不返回）
 
     Response:
-        成功: { "code": 200, "data": { "items": [...], "page": 1, "page_size": 10, "total": 25 } }
+        游标分页: { "code": 200, "data": { "items": [...], "page_size": 10, "next_cursor": "...", "has_more": true } }
+        页码分页: { "code": 200, "data": { "items": [...], "page": 1, "page_size": 10, "has_more": true, "total": 25 } }
     """
     # 校验 kb_id 格式
     if not is_valid_id(kb_id):
         return bad_request("无效的知识库 ID")
 
-    # 获取分页参数
-    try:
-        page = int(request.args.get("page", 1))
-        page_size = int(request.args.get("page_size", 10))
-    except ValueError:
-        return bad_request("分页参数必须为整数")
-
-    # 参数边界检查
-    if page < 1:
-        page = 1
-    if page_size < 1:
-        page_size = 10
-    if page_size > 100:
-        page_size = 100
+    # 获取分页参数（无法解析为整数时使用默认值）并做边界检查
+    page = request.args.get("page", type=int)
+    if page is not None:
+        page = max(page, 1)
+    page_size = request.args.get("page_size", 10, type=int)
+    page_size = min(page_size, 100) if page_size and page_size > 0 else 10
+
+    # 解析游标
+    cursor = None
+    raw_cursor = request.args.get("cursor")
+    if raw_cursor:
+        cursor = decode_cursor(raw_cursor)
+        if cursor is None:
+            return bad_request("无效的分页游标")
+
+    with_total = request.args.get("with_total", "").lower() in ("1", "true")
 
     # 获取当前用户 ID
     user_id = get_current_user_id()
@@ -175,7 +191,9 @@ def get_documents(kb_id):
         kb_id=kb_id,
         user_id=user_id,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        with_total=with_total
     )
 
     if error:
@@ -253,7 +271,7 @@ def delete_document(kb_id, doc_id):
             return not_found(error)
         return server_error(error)
 
-    logger.info(f"用户 {user_id} 删除文档: {doc_id}")
+    logger.info("用户 %s 删除文档: %s", user_id, doc_id)
 
     return success(message="删除成功")
 
@@ -296,7 +314,7 @@ def process_document(kb_id, doc_id):
         return bad_request("文档正在处理中，请稍候")
 
     # 提交处理任务
-    success_flag, error = document_processor.submit_process_task(
+    success_flag, error = _get_document_processor().submit_process_task(
         kb_id=kb_id,
         doc_id=doc_id,
         user_id=user_id
@@ -305,7 +323,7 @@ def process_document(kb_id, doc_id):
     if not success_flag:
         return server_error(error)
 
-    logger.info(f"用户 {user_id} 提交文档处理任务: {doc_id}")
+    logger.info("用户 %s 提交文档处理任务: %s", user_id, doc_id)
 
     return success(
         data={"id": doc_id, "status": "processing"},
@@ -351,7 +369,7 @@ def reprocess_document(kb_id, doc_id):
         return bad_request("文档正在处理中，请稍候")
 
     # 提交重处理任务
-    success_flag, error = document_processor.submit_reprocess_task(
+    success_flag, error = _get_document_processor().submit_reprocess_task(
         kb_id=kb_id,
         doc_id=doc_id,
         user_id=user_id
@@ -360,7 +378,7 @@ def reprocess_document(kb_id, doc_id):
     if not success_flag:
         return server_error(error)
 
-    logger.info(f"用户 {user_id} 提交文档重处理任务: {doc_id}")
+    logger.info("用户 %s 提交文档重处理任务: %s", user_id, doc_id)
 
     return success(
         data={"id": doc_id, "status": "processing"},
@@ -402,20 +420,10 @@ def get_document_chunks(kb_id, doc_id):
     if not is_valid_id(kb_id) or not is_valid_id(doc_id):
         return bad_request("无效的 ID 格式")
 
-    # 2. 获取分页参数
-    try:
-        page = int(request.args.get("page", 1))
-        page_size = int(request.args.get("page_size", 15))
-    except ValueError:
-        return bad_request("分页参数必须为整数")
-
-    # 参数边界检查
-    if page < 1:
-        page = 1
-    if page_size < 1:
-        page_size = 15
-    if page_size > 50:
-        page_size = 50
+    # 2. 获取分页参数（无法解析为整数时使用默认值）并做边界检查
+    page = max(request.args.get("page", 1, type=int) or 1, 1)
+    page_size = request.args.get("page_size", 15, type=int)
+    page_size = min(page_size, 50) if page_size and page_size > 0 else 15
 
     # 3. 获取搜索参数
     query_text = request.args.get("query", "").strip()
@@ -463,7 +471,7 @@ def get_document_chunks(kb_id, doc_id):
             embedding = get_embedding(settings)
             query_vector = embedding.embed_query(query_text)
         except Exception as e:
-            logger.error(f"查询向量化失败: {e}")
+            logger.error("查询向量化失败: %s", e)
             return server_error("查询处理失败")
 
         # 7.3 搜索
@@ -4,12 +4,16 @@
 提供知识库的增删改查 API 接口
 """
 
+from dataclasses import asdict
+
 from flask import Blueprint, request
 
+from app.dto.kb import KbCreateDTO, parse_update
 from app.services.knowledgebase_service import kb_service
 from app.util.auth import login_required, get_current_user_id
 from app.util.response import success, bad_request, not_found, server_error
 from app.util.logger import get_logger
+from app.util.pagination import decode_cursor
 
 
 logger = get_logger(__name__)
@@ -43,52 +47,21 @@ def create_knowledgebase():
     if not data:
         return bad_request("请求数据不能为空")
 
-    # 获取参数
-    name = data.get("name", "").strip()
-    description = data.get("description", "").strip() or None
-    chunk_size = data.get("chunk_size")
-    chunk_overlap = data.get("chunk_overlap")
-    cover_image = data.get("cover_image")  # 预留字段
-
-    # 参数校验
-    if not name:
-        return bad_request("知识库名称不能为空")
-
-    if len(name) > 128:
-        return bad_request("知识库名称不能超过 128 个字符")
-
-    if chunk_size is None:
-        return bad_request("分块大小不能为空")
-
-    if not isinstance(chunk_size, int) or chunk_size < 100 or chunk_size > 2000:
-        return bad_request("分块大小应为 100-2000 之间的整数")
-
-    if chunk_overlap is None:
-        return bad_request("分块重叠大小不能为空")
-
-    if not isinstance(chunk_overlap, int) or chunk_overlap < 0 or chunk_overlap > 200:
-        return bad_request("分块重叠大小应为 0-200 之间的整数")
-
-    if chunk_overlap >= chunk_size:
-        return bad_request("分块重叠大小不能大于等于分块大小")
+    # 解析并校验参数
+    dto, error = KbCreateDTO.from_json(data)
+    if error:
+        return bad_request(error)
 
     # 获取当前用户 ID
     user_id = get_current_user_id()
 
     # 创建知识库
-    kb_data, error = kb_service.create(
-        user_id=user_id,
-        name=name,
-        description=description,
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap,
-        cover_image=cover_image
-    )
+    kb_data, error = kb_service.create(user_id=user_id, **asdict(dto))
 
     if error:
         return bad_request(error)
 
-    logger.info(f"用户 {user_id} 创建知识库: {name}")
+    logger.info("用户 %s 创建知识库: %s", user_id, dto.name)
 
     return success(data=kb_data, message="创建成功")
 
@@ -100,26 +73,31 @@ def get_knowledgebases():
     获取知识库列表（分页）
 
     Query Params:
-        page: 页码（默认 1）
         page_size: 每页数量（默认 10）
+        cursor: 分页游标（取上一页返回的 next_cursor，第一页不传）
+        page: 页码（可选，传入时使用页码分页）
+        with_total: 是否返回总数（true/1，默认不返回）
 
     Response:
-        成功: { "code": 200, "data": { "items": [...], "page": 1, "page_size": 10, "total": 25 } }
+        游标分页: { "code": 200, "data": { "items": [...], "page_size": 10, "has_more": true, "next_cursor": "..." } }
+        页码分页: { "code": 200, "data": { "items": [...], "page_size": 10, "has_more": true, "page": 1, "total": 25 } }
     """
-    # 获取分页参数
-    try:
-        page = int(request.args.get("page", 1))
-        page_size = int(request.args.get("page_size", 10))
-    except ValueError:
-        return bad_request("分页参数必须为整数")
-
-    # 参数边界检查
-    if page < 1:
-        page = 1
-    if page_size < 1:
-        page_size = 10
-    if page_size > 100:
-        page_size = 100
+    # 获取分页参数（无法解析为整数时使用默认值）并做边界检查
+    page = request.args.get("page", type=int)
+    if page is not None:
+        page = max(page, 1)
+    page_size = request.args.get("page_size", 10, type=int)
+    page_size = min(page_size, 100) if page_size and page_size > 0 else 10
+
+    # 解析游标
+    cursor = None
+    raw_cursor = request.args.get("cursor")
+    if raw_cursor:
+        cursor = decode_cursor(raw_cursor)
+        if cursor is None:
+            return bad_request("无效的分页游标")
+
+    with_total = request.args.get("with_total", "").lower() in ("1", "true")
 
     # 获取当前用户 ID
     user_id = get_current_user_id()
@@ -128,7 +106,9 @@ def get_knowledgebases():
     result, error = kb_service.get_list(
         user_id=user_id,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        cursor=cursor,
+        with_total=with_total
     )
 
     if error:
@@ -189,41 +169,10 @@ def update_knowledgebase(kb_id):
     if not data:
         return bad_request("请求数据不能为空")
 
-    # 构建更新数据
-    update_data = {}
-
-    # 校验并收集更新字段
-    if "name" in data:
-        name = data["name"].strip() if data["name"] else ""
-        if not name:
-            return bad_request("知识库名称不能为空")
-        if len(name) > 128:
-            return bad_request("知识库名称不能超过 128 个字符")
-        update_data["name"] = name
-
-    if "description" in data:
-        update_data["description"] = data["description"].strip() if data["description"] else None
-
-    if "chunk_size" in data:
-        chunk_size = data["chunk_size"]
-        if not isinstance(chunk_size, int) or chunk_size < 100 or chunk_size > 2000:
-            return bad_request("分块大小应为 100-2000 之间的整数")
-        update_data["chunk_size"] = chunk_size
-
-    if "chunk_overlap" in data:
-        chunk_overlap = data["chunk_overlap"]
-        if not isinstance(chunk_overlap, int) or chunk_overlap < 0 or chunk_overlap > 200:
-            return bad_request("分块重叠大小应为 0-200 之间的整数")
-        update_data["chunk_overlap"] = chunk_overlap
-
-    # 校验 chunk_overlap < chunk_size（如果两者都有更新）
-    # 注意：如果只更新其中一个，需要在 Service 层结合数据库现有值进行校验
-    if "chunk_size" in update_data and "chunk_overlap" in update_data:
-        if update_data["chunk_overlap"] >= update_data["chunk_size"]:
-            return bad_request("分块重叠大小不能大于等于分块大小")
-
-    if "cover_image" in data:
-        update_data["cover_image"] = data["cover_image"]
+    # 按字段表校验并收集更新字段
+    update_data, error = parse_update(data)
+    if error:
+        return bad_request(error)
 
     if not update_data:
         return bad_request("没有有效的更新字段")
@@ -239,7 +188,7 @@ def update_knowledgebase(kb_id):
             return not_found(error)
         return bad_request(error)
 
-    logger.info(f"用户 {user_id} 更新知识库: {kb_id}")
+    logger.info("用户 %s 更新知识库: %s", user_id, kb_id)
 
     return success(data=kb_data, message="更新成功")
 
@@ -268,6 +217,6 @@ def delete_knowledgebase(kb_id):
             return not_found(error)
         return server_error(error)
 
-    logger.info(f"用户 {user_id} 删除知识库: {kb_id}")
+    logger.info("用户 %s 删除知识库: %s", user_id, kb_id)
 
     return success(message="删除成功")
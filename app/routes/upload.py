@@ -4,7 +4,8 @@
 提供图片上传和文件访问 API
 """
 
-import os
+import re
+import urllib.parse
 from flask import Blueprint, request, send_file, abort
 
 from app.services.storage import get_storage_provider
@@ -18,6 +19,33 @@ from app.config import Config
 logger = get_logger(__name__)
 
 
+# 可疑路径模式（一次正则匹配完成全部检查）：
+# 1. Unix 绝对路径 / 或以 \ 开头
+# 2. Windows 绝对路径: C: D: 等（第二个字符为冒号）
+# 3. 相对路径遍历: ..
+# 4. Windows 路径分隔符: \
+# 5. Null 字节截断
+_DANGEROUS_PATH_RE = re.compile(r'(?s)^[/\\]|^.:|\.\.|\\|\x00')
+
+# 存储类型在进程生命周期内不变，导入时判断一次
+_IS_LOCAL_STORAGE = Config.STORAGE_TYPE.lower() == 'local'
+
+# 按扩展名返回的 MIME 类型；其余类型一律按二进制下载，避免浏览器把上传内容当作页面执行
+MIME_TYPES = {
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'webp': 'image/webp',
+}
+
+# 上传文件的 object_key 随机生成、内容不会被覆盖，浏览器可以长期缓存（1 年）
+FILE_CACHE_MAX_AGE = 365 * 24 * 3600
+
+# 图片上传请求体上限：图片上限再预留 1MB 给 multipart 表单开销
+_MAX_IMAGE_REQUEST_SIZE = Config.MAX_IMAGE_SIZE + 1024 * 1024
+
+
 # 创建上传蓝图
 upload_bp = Blueprint("upload", __name__)
 
@@ -37,6 +65,10 @@ def upload_image():
         成功: { "code": 200, "data": { "object_key": "...", "url": "..." } }
         失败: { "code": 400, "message": "错误信息" }
     """
+    # 请求体明显超过图片上限时，在解析表单（落盘临时文件）之前直接拒绝
+    if request.content_length and request.content_length > _MAX_IMAGE_REQUEST_SIZE:
+        return bad_request(f"文件大小超过限制，最大允许: {Config.MAX_IMAGE_SIZE / (1024 * 1024):.1f}MB")
+
     # 检查是否有文件上传
     if 'file' not in request.files:
         return bad_request("请选择要上传的文件")
@@ -97,41 +129,20 @@ def get_file(object_key):
         失败: 404
     """
     # 仅本地存储支持此接口
-    if Config.STORAGE_TYPE.lower() != 'local':
+    if not _IS_LOCAL_STORAGE:
         return not_found("此接口仅支持本地存储模式")
     
-    # 安全检查：防止路径遍历攻击
-    # 检查的模式包括：
-    # 1. 相对路径遍历: ..
-    # 2. Unix 绝对路径: /
-    # 3. Windows 路径分隔符: \
-    # 4. Windows 绝对路径: C: D: 等
-    # 5. URL 编码的路径遍历: %2e%2e
-    import urllib.parse
-    decoded_key = urllib.parse.unquote(object_key)
-    
-    dangerous_patterns = [
-        '..',           # 相对路径遍历
-        '\\',          # Windows 路径分隔符
-        '\x00',        # Null 字节截断
-    ]
-    
-    if (decoded_key.startswith('/') or 
-        decoded_key.startswith('\\') or
-        (len(decoded_key) >= 2 and decoded_key[1] == ':') or  # Windows 绝对路径 C:
-        any(pattern in decoded_key for pattern in dangerous_patterns)):
+    # 安全检查：防止路径遍历攻击（含 URL 编码的路径遍历 %2e%2e）
+    decoded_key = urllib.parse.unquote(object_key) if '%' in object_key else object_key
+
+    if _DANGEROUS_PATH_RE.search(decoded_key):
         logger.warning(f"检测到可疑的路径访问: {object_key}")
         return not_found("文件不存在")
     
     try:
-        # 获取本地存储提供者
-        from app.services.storage.local_storage import LocalStorageProvider
+        # 获取本地存储提供者（单例，存储类型已在上面确认）
         storage = get_storage_provider()
         
-        # 确认是本地存储
-        if not isinstance(storage, LocalStorageProvider):
-            return not_found("此接口仅支持本地存储模式")
-        
         # 获取文件路径
         file_path = storage.get_file_path(object_key)
         
@@ -139,21 +150,18 @@ def get_file(object_key):
             return not_found("文件不存在")
         
         # 获取 MIME 类型
-        ext = os.path.splitext(object_key)[1].lower()
-        mime_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp',
-        }
-        mime_type = mime_types.get(ext, 'application/octet-stream')
+        ext = object_key.rpartition('.')[2].lower()
+        mime_type = MIME_TYPES.get(ext, 'application/octet-stream')
         
-        return send_file(
+        # send_file 默认按文件 mtime/大小生成 ETag 并处理条件请求（304）
+        response = send_file(
             file_path,
             mimetype=mime_type,
-            as_attachment=False
+            as_attachment=False,
+            max_age=FILE_CACHE_MAX_AGE
         )
+        response.cache_control.immutable = True
+        return response
         
     except Exception as e:
         logger.error(f"获取文件失败: {e}")
@@ -179,11 +187,8 @@ def get_file_url():
     if not object_key:
         return bad_request("缺少 object_key 参数")
     
-    # 获取过期时间
-    try:
-        expires = int(request.args.get('expires', 3600))
-    except ValueError:
-        expires = 3600
+    # 获取过期时间（无法解析为整数时使用默认值）
+    expires = request.args.get('expires', 3600, type=int) or 3600
     
     # 获取存储提供者
     try:
@@ -0,0 +1,61 @@
+"""
+知识库归属缓存模块
+
+缓存 (kb_id, user_id) 归属校验结果，避免同一知识库在短时间内被反复查询。
+知识库创建/删除时按 (kb_id, user_id) 移除对应条目；
+其他进程中的写入由 TTL 兜底。写操作不应依赖此缓存，应直接查询数据库。
+"""
+
+from app.models.knowledgebase import Knowledgebase
+from app.util.db import session_scope
+from app.util.ttl_cache import TTLCache
+
+
+OWNERSHIP_TTL = 30
+
+_cache = TTLCache(ttl=OWNERSHIP_TTL, maxsize=4096)
+
+
+def _query_owned(session, kb_id: str, user_id: str) -> bool:
+    return session.query(Knowledgebase.id).filter(
+        Knowledgebase.id == kb_id,
+        Knowledgebase.user_id == user_id
+    ).first() is not None
+
+
+def kb_owned_by(kb_id: str, user_id: str, session=None) -> bool:
+    """
+    判断知识库是否存在且属于指定用户（带缓存）
+
+    Args:
+        kb_id: 知识库 ID
+        user_id: 用户 ID
+        session: 可选的数据库会话，未命中时复用该会话查询
+
+    Returns:
+        是否存在且归属当前用户
+    """
+    key = (kb_id, user_id)
+    owned = _cache.get(key)
+    if owned is not None:
+        return owned
+
+    if session is not None:
+        owned = _query_owned(session, kb_id, user_id)
+    else:
+        with session_scope() as new_session:
+            owned = _query_owned(new_session, kb_id, user_id)
+
+    _cache.set(key, owned)
+    return owned
+
+
+def invalidate_kb(kb_id: str, user_id: str) -> None:
+    """
+    使指定知识库的归属缓存失效
+
+    Args:
+        kb_id: 知识库 ID
+        user_id: 用户 ID
+    """
+    _cache.pop((kb_id, user_id))
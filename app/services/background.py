@@ -0,0 +1,79 @@
+"""
+后台任务模块
+
+提供进程内共享的小型线程池，用于执行不需要阻塞 HTTP 响应的收尾工作（如删除存储文件）
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from app.util.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# 后台线程数：收尾任务以存储 I/O 为主，少量线程即可
+BACKGROUND_WORKERS = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    获取后台线程池（单例，首次使用时创建）
+
+    Returns:
+        ThreadPoolExecutor: 线程池实例
+    """
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=BACKGROUND_WORKERS,
+                    thread_name_prefix="background"
+                )
+    return _executor
+
+
+def _log_failure(future: Future) -> None:
+    """后台任务异常时记录日志，避免异常被静默吞掉"""
+    exc = future.exception()
+    if exc is not None:
+        logger.error("后台任务执行失败: %s", exc)
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    """
+    提交后台任务
+
+    Args:
+        fn: 任务函数
+        *args: 位置参数
+        **kwargs: 关键字参数
+
+    Returns:
+        Future: 任务句柄
+    """
+    future = get_executor().submit(fn, *args, **kwargs)
+    future.add_done_callback(_log_failure)
+    return future
+
+
+def shutdown(wait: bool = True) -> None:
+    """
+    关闭后台线程池
+
+    Args:
+        wait: 是否等待已提交的任务完成
+    """
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=wait)
+            _executor = None
+            logger.info("后台线程池已关闭")
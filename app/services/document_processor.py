@@ -199,7 +199,7 @@ class DocumentProcessor:
                     raise Exception(f"创建 Collection 失败: {error}")
 
             # 8. 批量向量化
-            logger.debug(f"开始向量化: doc_id={doc_id}, chunks={len(chunks)}")
+            logger.debug("开始向量化: doc_id=%s, chunks=%s", doc_id, len(chunks))
             embeddings = embedding.embed_documents(chunks)
 
             # 9. 插入向量存储
@@ -244,7 +244,7 @@ class DocumentProcessor:
             if temp_file_path:
                 try:
                     os.remove(temp_file_path)
-                    logger.debug(f"临时文件已清理: {temp_file_path}")
+                    logger.debug("临时文件已清理: %s", temp_file_path)
                 except Exception:
                     pass
 
@@ -279,7 +279,7 @@ class DocumentProcessor:
                 f.write(response.content)
                 temp_path = f.name
 
-            logger.debug(f"文件下载到临时目录: {temp_path}")
+            logger.debug("文件下载到临时目录: %s", temp_path)
             return temp_path
 
         except Exception as e:
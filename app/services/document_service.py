@@ -4,23 +4,39 @@
 提供文档的创建、查询、更新、删除等业务逻辑
 """
 
+from datetime import datetime
 from typing import Optional, Tuple, Dict, Any, List
 
+from sqlalchemy import and_, or_, select
 from sqlalchemy.exc import IntegrityError
 
 from app.models.document import Document, DocumentStatus
 from app.models.knowledgebase import Knowledgebase
+from app.services.auth_cache import kb_owned_by
+from app.services.file_cleanup import record_orphans, schedule_delete
 from app.util.db import session_scope
 from app.util.logger import get_logger
+from app.util.pagination import encode_cursor
+from app.util.ttl_cache import TTLCache
 
 
 logger = get_logger(__name__)
 
+# 列表接口只投影需要序列化的列；file_path、file_hash 与可能很长的 error_message 仅在详情中返回
+_LIST_COLUMNS = (
+    Document.id,
+    Document.kb_id,
+    Document.name,
+    Document.file_type,
+    Document.file_size,
+    Document.status,
+    Document.chunk_count,
+    Document.created_at,
+    Document.updated_at,
+)
 
-def _get_storage_provider():
-    """延迟加载存储提供者，避免循环导入"""
-    from app.services.storage import get_storage_provider
-    return get_storage_provider()
+# 文档总数缓存，键为 (user_id, kb_id)；创建/删除文档时失效，TTL 兜底其他进程的写入
+_total_cache = TTLCache(ttl=30, maxsize=4096)
 
 
 class DocumentService:
@@ -33,7 +49,8 @@ class DocumentService:
         name: str,
         file_path: str,
         file_type: str,
-        file_size: int
+        file_size: int,
+        file_hash: Optional[str] = None
     ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
         创建文档记录
@@ -45,19 +62,15 @@ class DocumentService:
             file_path: 文件存储路径（object_key）
             file_type: 文件类型
             file_size: 文件大小（字节）
+            file_hash: 文件内容 SHA-256 摘要
 
         Returns:
             (文档信息字典, 错误信息)
         """
         try:
             with session_scope() as session:
-                # 验证知识库存在且属于当前用户
-                kb = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id,
-                    Knowledgebase.user_id == user_id
-                ).first()
-
-                if not kb:
+                # 写操作不走缓存，直接验证知识库存在且属于当前用户（按主键获取）
+                if not self._kb_owned(session, kb_id, user_id):
                     return None, "知识库不存在或无权访问"
 
                 # 创建文档
@@ -67,6 +80,7 @@ class DocumentService:
                     file_path=file_path,
                     file_type=file_type,
                     file_size=file_size,
+                    file_hash=file_hash,
                     status=DocumentStatus.PENDING
                 )
 
@@ -74,72 +88,155 @@ class DocumentService:
                 session.flush()
 
                 doc_dict = doc.to_dict()
-                logger.info(f"文档 {name} 创建成功，ID: {doc.id}")
-                return doc_dict, None
+                logger.info("文档 %s 创建成功，ID: %s", name, doc.id)
+
+            _total_cache.pop((user_id, kb_id))
+            return doc_dict, None
 
         except Exception as e:
-            logger.error(f"创建文档异常: {e}")
+            logger.error("创建文档异常: %s", e)
             return None, "服务器内部错误"
 
-    def get_list(
+    def find_by_hash(
         self,
         kb_id: str,
         user_id: str,
-        page: int = 1,
-        page_size: int = 10
+        file_hash: str
     ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
-        分页获取知识库的文档列表
+        查找知识库中内容相同的文档
 
         Args:
             kb_id: 知识库 ID
             user_id: 用户 ID（用于权限验证）
-            page: 页码
-            page_size: 每页数量
+            file_hash: 文件内容 SHA-256 摘要
 
         Returns:
-            (分页数据字典, 错误信息)
+            (已存在的文档信息字典，不存在时为 None, 错误信息)
         """
         try:
             with session_scope() as session:
-                # 验证知识库存在且属于当前用户
-                kb = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id,
-                    Knowledgebase.user_id == user_id
-                ).first()
-
-                if not kb:
+                # 联表查询，同时校验知识库归属
+                doc = session.query(Document)\
+                    .join(Knowledgebase, Knowledgebase.id == Document.kb_id)\
+                    .filter(
+                        Document.kb_id == kb_id,
+                        Document.file_hash == file_hash,
+                        Knowledgebase.user_id == user_id
+                    ).first()
+
+                if doc:
+                    return doc.to_dict(), None
+
+                # 未命中时再区分知识库不存在/无权访问
+                if not kb_owned_by(kb_id, user_id, session):
                     return None, "知识库不存在或无权访问"
+                return None, None
 
-                # 查询文档列表
-                query = session.query(Document).filter(
-                    Document.kb_id == kb_id
-                )
+        except Exception as e:
+            logger.error("按哈希查询文档异常: %s", e)
+            return None, "服务器内部错误"
 
-                # 获取总数
-                total = query.count()
+    def get_list(
+        self,
+        kb_id: str,
+        user_id: str,
+        page: Optional[int] = None,
+        page_size: int = 10,
+        cursor: Optional[Tuple[datetime, str]] = None,
+        with_total: bool = False
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        分页获取知识库的文档列表，按创建时间倒序
 
-                # 分页查询，按创建时间倒序
-                offset = (page - 1) * page_size
-                docs = query.order_by(Document.created_at.desc())\
-                    .offset(offset)\
-                    .limit(page_size)\
-                    .all()
+        默认使用游标（keyset）分页：按 (created_at, id) 定位，不扫描丢弃前序行，也不统计总数；
+        传入 page 时使用旧的页码分页，with_total 为 True 时额外返回总数（短期缓存）。
 
-                # 转换为字典列表
-                items = [doc.to_dict() for doc in docs]
+        Args:
+            kb_id: 知识库 ID
+            user_id: 用户 ID（用于权限验证）
+            page: 页码（仅页码分页）
+            page_size: 每页数量
+            cursor: 上一页最后一条记录的 (created_at, id)，为空表示第一页
+            with_total: 页码分页时是否返回总数
 
-                result = {
-                    "items": items,
-                    "page": page,
-                    "page_size": page_size,
-                    "total": total
-                }
+        Returns:
+            (分页数据字典, 错误信息)
+        """
+        try:
+            with session_scope() as session:
+                # 只投影列表所需的列，跳过 ORM 对象构建，每行即为字典映射
+                # 联表过滤知识库归属，不再单独查询知识库
+                stmt = select(*_LIST_COLUMNS)\
+                    .join(Knowledgebase, Knowledgebase.id == Document.kb_id)\
+                    .where(Document.kb_id == kb_id, Knowledgebase.user_id == user_id)\
+                    .order_by(Document.created_at.desc(), Document.id.desc())
+
+                if page is not None:
+                    # 页码分页：多取一条判断是否还有下一页
+                    offset = (page - 1) * page_size
+                    rows = session.execute(
+                        stmt.offset(offset).limit(page_size + 1)
+                    ).mappings().all()
+
+                    if not rows and not kb_owned_by(kb_id, user_id, session):
+                        return None, "知识库不存在或无权访问"
+
+                    result = {
+                        "items": [Document.row_to_dict(row) for row in rows[:page_size]],
+                        "page": page,
+                        "page_size": page_size,
+                        "has_more": len(rows) > page_size
+                    }
+
+                    if with_total:
+                        cache_key = (user_id, kb_id)
+                        total = _total_cache.get(cache_key)
+                        if total is None:
+                            # 联表计数，归属已由上面的查询校验
+                            total = session.query(Document.id)\
+                                .join(Knowledgebase, Knowledgebase.id == Document.kb_id)\
+                                .filter(Document.kb_id == kb_id, Knowledgebase.user_id == user_id)\
+                                .count()
+                            _total_cache.set(cache_key, total)
+                        result["total"] = total
+
+                    return result, None
+
+                # 游标分页：从上一页最后一条记录之后继续取
+                if cursor is not None:
+                    cursor_created_at, cursor_id = cursor
+                    stmt = stmt.where(or_(
+                        Document.created_at < cursor_created_at,
+                        and_(
+                            Document.created_at == cursor_created_at,
+                            Document.id < cursor_id
+                        )
+                    ))
+
+                # 多取一条判断是否还有下一页
+                rows = session.execute(stmt.limit(page_size + 1)).mappings().all()
+
+                # 结果为空时才区分知识库不存在/无权访问
+                if not rows and not kb_owned_by(kb_id, user_id, session):
+                    return None, "知识库不存在或无权访问"
+                has_more = len(rows) > page_size
+                rows = rows[:page_size]
 
-                return result, None
+                next_cursor = None
+                if has_more:
+                    last = rows[-1]
+                    next_cursor = encode_cursor(last["created_at"], last["id"])
+
+                return {
+                    "items": [Document.row_to_dict(row) for row in rows],
+                    "page_size": page_size,
+                    "next_cursor": next_cursor,
+                    "has_more": has_more
+                }, None
 
         except Exception as e:
-            logger.error(f"查询文档列表失败: {e}")
+            logger.error("查询文档列表失败: %s", e)
             return None, "服务器内部错误"
 
     def get_by_id(
@@ -161,28 +258,15 @@ class DocumentService:
         """
         try:
             with session_scope() as session:
-                # 验证知识库存在且属于当前用户
-                kb = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id,
-                    Knowledgebase.user_id == user_id
-                ).first()
-
-                if not kb:
-                    return None, "知识库不存在或无权访问"
-
-                # 查询文档
-                doc = session.query(Document).filter(
-                    Document.id == doc_id,
-                    Document.kb_id == kb_id
-                ).first()
-
-                if not doc:
-                    return None, "文档不存在"
+                # 一次联表查询同时校验知识库归属并获取文档
+                doc, error = self._get_owned_document(session, kb_id, doc_id, user_id)
+                if error:
+                    return None, error
 
                 return doc.to_dict(), None
 
         except Exception as e:
-            logger.error(f"查询文档失败: {e}")
+            logger.error("查询文档失败: %s", e)
             return None, "服务器内部错误"
 
     def delete(
@@ -207,23 +291,10 @@ class DocumentService:
 
         try:
             with session_scope() as session:
-                # 验证知识库存在且属于当前用户
-                kb = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id,
-                    Knowledgebase.user_id == user_id
-                ).first()
-
-                if not kb:
-                    return False, "知识库不存在或无权访问"
-
-                # 查询文档
-                doc = session.query(Document).filter(
-                    Document.id == doc_id,
-                    Document.kb_id == kb_id
-                ).first()
-
-                if not doc:
-                    return False, "文档不存在"
+                # 一次联表查询同时校验知识库归属并获取文档
+                doc, error = self._get_owned_document(session, kb_id, doc_id, user_id)
+                if error:
+                    return False, error
 
                 # 禁止删除正在处理中的文档
                 if doc.status == DocumentStatus.PROCESSING:
@@ -233,16 +304,21 @@ class DocumentService:
                 file_to_delete = doc.file_path
 
                 session.delete(doc)
-                logger.info(f"文档 {doc_name}({doc_id}) 删除成功")
+                # 与文档记录的删除在同一事务中登记待清理文件
+                if file_to_delete:
+                    record_orphans(session, [file_to_delete])
+                logger.info("文档 %s(%s) 删除成功", doc_name, doc_id)
+
+            _total_cache.pop((user_id, kb_id))
 
-            # 事务成功后删除存储文件
+            # 事务成功后在后台删除存储文件，不阻塞响应
             if file_to_delete:
-                self._delete_file(file_to_delete)
+                schedule_delete([file_to_delete])
 
             return True, None
 
         except Exception as e:
-            logger.error(f"删除文档异常: {e}")
+            logger.error("删除文档异常: %s", e)
             return False, "服务器内部错误"
 
     def update_status(
@@ -273,23 +349,10 @@ class DocumentService:
 
         try:
             with session_scope() as session:
-                # 验证知识库存在且属于当前用户
-                kb = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id,
-                    Knowledgebase.user_id == user_id
-                ).first()
-
-                if not kb:
-                    return None, "知识库不存在或无权访问"
-
-                # 查询文档
-                doc = session.query(Document).filter(
-                    Document.id == doc_id,
-                    Document.kb_id == kb_id
-                ).first()
-
-                if not doc:
-                    return None, "文档不存在"
+                # 一次联表查询同时校验知识库归属并获取文档
+                doc, error = self._get_owned_document(session, kb_id, doc_id, user_id)
+                if error:
+                    return None, error
 
                 # 更新状态
                 doc.status = status
@@ -300,32 +363,64 @@ class DocumentService:
 
                 session.flush()
                 doc_dict = doc.to_dict()
-                logger.info(f"文档 {doc_id} 状态更新为: {status}")
+                logger.info("文档 %s 状态更新为: %s", doc_id, status)
                 return doc_dict, None
 
         except Exception as e:
-            logger.error(f"更新文档状态异常: {e}")
+            logger.error("更新文档状态异常: %s", e)
             return None, "服务器内部错误"
 
-    def _delete_file(self, object_key: str) -> None:
+    @staticmethod
+    def _kb_owned(session, kb_id: str, user_id: str) -> bool:
         """
-        删除存储文件
+        判断知识库是否存在且属于指定用户（按主键获取，不走缓存，用于写操作）
 
         Args:
-            object_key: 文件的 object_key
+            session: 数据库会话
+            kb_id: 知识库 ID
+            user_id: 用户 ID
+
+        Returns:
+            是否存在且归属当前用户
         """
-        if not object_key:
-            return
+        kb = session.get(Knowledgebase, kb_id)
+        return kb is not None and kb.user_id == user_id
 
-        try:
-            storage = _get_storage_provider()
-            success, error = storage.delete(object_key)
-            if success:
-                logger.info(f"文档文件删除成功: {object_key}")
-            else:
-                logger.warning(f"文档文件删除失败: {error}")
-        except Exception as e:
-            logger.warning(f"删除文档文件异常: {e}")
+    def _get_owned_document(
+        self,
+        session,
+        kb_id: str,
+        doc_id: str,
+        user_id: str
+    ) -> Tuple[Optional[Document], Optional[str]]:
+        """
+        联表查询属于当前用户知识库的文档
+
+        命中时只需一次查询；未命中时再区分知识库不存在与文档不存在
+
+        Args:
+            session: 数据库会话
+            kb_id: 知识库 ID
+            doc_id: 文档 ID
+            user_id: 用户 ID
+
+        Returns:
+            (文档对象, 错误信息)
+        """
+        doc = session.query(Document)\
+            .join(Knowledgebase, Knowledgebase.id == Document.kb_id)\
+            .filter(
+                Document.id == doc_id,
+                Document.kb_id == kb_id,
+                Knowledgebase.user_id == user_id
+            ).first()
+
+        if doc:
+            return doc, None
+
+        if not kb_owned_by(kb_id, user_id, session):
+            return None, "知识库不存在或无权访问"
+        return None, "文档不存在"
 
 
 # 创建全局服务实例
@@ -7,7 +7,7 @@ Embedding 工厂
 from typing import Dict, Any
 
 from app.util.logger import get_logger
-from app.util.models_config import EMBEDDING_MODELS
+from app.util.models_config import EMBEDDING_MODEL_INDEX
 
 logger = get_logger(__name__)
 
@@ -80,13 +80,9 @@ def get_embedding_dimension(settings: Dict[str, Any]) -> int:
     provider = settings.get('embedding_provider', 'huggingface')
     model_name = settings.get('embedding_model_name')
 
-    provider_config = EMBEDDING_MODELS.get(provider, {})
-    models = provider_config.get('models', [])
-
-    for model in models:
-        if model.get('path') == model_name or model.get('name') == model_name:
-            dimension = model.get('dimension', '1536')
-            return int(dimension)
+    model = EMBEDDING_MODEL_INDEX.get((provider, model_name))
+    if model is not None:
+        return int(model.get('dimension', '1536'))
 
     # 默认维度
     logger.warning(f"未找到模型 {model_name} 的维度配置，使用默认值 1536")
@@ -0,0 +1,125 @@
+"""
+存储文件清理模块
+
+业务记录删除时在同一事务中登记待清理文件（orphan_file），
+事务提交后在后台线程删除存储文件并移除登记；删除失败的文件保留登记并累计失败次数，
+由 `flask sweep-orphan-files` 按指数退避重试，持续失败的文件不会占住每批的开头。
+"""
+
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import delete, or_, select
+
+from app.models.orphan_file import OrphanFile
+from app.services import background
+from app.services.storage import get_storage_provider
+from app.util.db import session_scope
+from app.util.logger import get_logger
+
+
+logger = get_logger(__name__)
+
+# 清理命令只重试登记超过该时长的文件，避免与刚提交的后台删除任务重复
+SWEEP_MIN_AGE = timedelta(minutes=10)
+
+# 单次清理的最大文件数
+SWEEP_BATCH_SIZE = 1000
+
+# 删除失败后的重试退避：首次失败后等待 RETRY_BACKOFF_BASE，之后每次翻倍，最长 RETRY_BACKOFF_MAX
+RETRY_BACKOFF_BASE = timedelta(minutes=10)
+RETRY_BACKOFF_MAX = timedelta(days=1)
+
+
+def record_orphans(session, object_keys: List[str]) -> None:
+    """
+    在当前事务中登记待清理文件
+
+    Args:
+        session: 数据库会话（与业务记录的删除处于同一事务）
+        object_keys: 文件的 object_key 列表
+    """
+    session.add_all(OrphanFile(object_key=object_key) for object_key in object_keys)
+
+
+def _retry_backoff(attempts: int) -> timedelta:
+    """第 attempts 次失败后距下次重试的等待时间"""
+    return min(RETRY_BACKOFF_BASE * 2 ** (attempts - 1), RETRY_BACKOFF_MAX)
+
+
+def delete_files(object_keys: List[str]) -> int:
+    """
+    删除存储文件，逐个文件处理登记
+
+    删除成功的文件移除登记；删除失败的文件保留登记，累计失败次数并设置下次重试时间。
+
+    Args:
+        object_keys: 文件的 object_key 列表
+
+    Returns:
+        删除成功的文件数
+    """
+    object_keys = list(dict.fromkeys(object_keys))
+    if not object_keys:
+        return 0
+
+    try:
+        storage = get_storage_provider()
+        failed_keys, error = storage.delete_many(object_keys)
+    except Exception as e:
+        logger.warning("删除存储文件异常: %s", e)
+        failed_keys, error = object_keys, str(e)
+
+    failed = set(failed_keys)
+    deleted_keys = [object_key for object_key in object_keys if object_key not in failed]
+
+    with session_scope() as session:
+        if deleted_keys:
+            session.execute(delete(OrphanFile).where(OrphanFile.object_key.in_(deleted_keys)))
+        if failed:
+            now = datetime.now()
+            records = session.execute(
+                select(OrphanFile).where(OrphanFile.object_key.in_(failed))
+            ).scalars()
+            for record in records:
+                record.attempts = (record.attempts or 0) + 1
+                record.next_attempt_at = now + _retry_backoff(record.attempts)
+
+    if failed:
+        logger.warning("存储文件删除失败 %s 个，保留待清理登记: %s", len(failed), error)
+    if deleted_keys:
+        logger.info("存储文件删除成功: %s 个", len(deleted_keys))
+    return len(deleted_keys)
+
+
+def schedule_delete(object_keys: List[str]) -> None:
+    """
+    在后台线程删除存储文件，不阻塞当前请求
+
+    Args:
+        object_keys: 文件的 object_key 列表（对应的登记须已提交）
+    """
+    if object_keys:
+        background.submit(delete_files, list(object_keys))
+
+
+def sweep_orphan_files() -> int:
+    """
+    重试删除登记时间超过 SWEEP_MIN_AGE 且已到重试时间的待清理文件
+
+    Returns:
+        本次删除成功的文件数
+    """
+    now = datetime.now()
+    with session_scope() as session:
+        object_keys = session.execute(
+            select(OrphanFile.object_key)
+            .where(
+                OrphanFile.created_at < now - SWEEP_MIN_AGE,
+                or_(OrphanFile.next_attempt_at.is_(None), OrphanFile.next_attempt_at <= now),
+            )
+            .order_by(OrphanFile.created_at)
+            .limit(SWEEP_BATCH_SIZE)
+        ).scalars().all()
+
+    return delete_files(object_keys)
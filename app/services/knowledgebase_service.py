@@ -4,22 +4,42 @@
 提供知识库的创建、查询、更新、删除等业务逻辑
 """
 
+from datetime import datetime
 from typing import Optional, Tuple, Dict, Any, List
 
+from sqlalchemy import and_, func, or_, select, update
 from sqlalchemy.exc import IntegrityError
 
+from app.models.document import Document
 from app.models.knowledgebase import Knowledgebase
-from app.util.db import session_scope
+from app.services.auth_cache import invalidate_kb
+from app.services.file_cleanup import record_orphans, schedule_delete
+from app.services.storage import get_storage_provider
+from app.util.db import is_duplicate_key, session_scope
 from app.util.logger import get_logger
+from app.util.pagination import encode_cursor
+from app.util.ttl_cache import TTLCache
 
 
 logger = get_logger(__name__)
 
+# 列表接口只投影卡片展示需要的列，user_id 已由查询条件确定，无需返回
+_LIST_COLUMNS = (
+    Knowledgebase.id,
+    Knowledgebase.name,
+    Knowledgebase.description,
+    Knowledgebase.cover_image,
+    Knowledgebase.chunk_size,
+    Knowledgebase.chunk_overlap,
+    Knowledgebase.created_at,
+    Knowledgebase.updated_at,
+)
 
-def _get_storage_provider():
-    """延迟加载存储提供者，避免循环导入"""
-    from app.services.storage import get_storage_provider
-    return get_storage_provider()
+# 允许更新的字段
+_UPDATE_FIELDS = frozenset({"name", "description", "chunk_size", "chunk_overlap", "cover_image"})
+
+# 知识库总数缓存，键为 user_id；创建/删除知识库时失效，TTL 兜底其他进程的写入
+_total_cache = TTLCache(ttl=30, maxsize=4096)
 
 
 class KnowledgebaseService:
@@ -37,10 +57,10 @@ class KnowledgebaseService:
         """
         if kb_dict.get('cover_image'):
             try:
-                storage = _get_storage_provider()
+                storage = get_storage_provider()
                 kb_dict['cover_image_url'] = storage.get_url(kb_dict['cover_image'])
             except Exception as e:
-                logger.warning(f"获取封面图片 URL 失败: {e}")
+                logger.warning("获取封面图片 URL 失败: %s", e)
                 kb_dict['cover_image_url'] = None
         else:
             kb_dict['cover_image_url'] = None
@@ -48,7 +68,7 @@ class KnowledgebaseService:
     
     def _convert_cover_url_list(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
-        批量转换列表中的 cover_image URL
+        批量转换列表中的 cover_image URL（一次批量获取，重复封面只生成一次）
         
         Args:
             items: 知识库字典列表
@@ -56,28 +76,18 @@ class KnowledgebaseService:
         Returns:
             转换后的列表
         """
-        return [self._convert_cover_url(item) for item in items]
-    
-    def _delete_cover_image(self, object_key: Optional[str]) -> None:
-        """
-        删除封面图片
-        
-        Args:
-            object_key: 图片的 object_key
-        """
-        if not object_key:
-            return
-        
-        try:
-            storage = _get_storage_provider()
-            success, error = storage.delete(object_key)
-            if success:
-                logger.info(f"封面图片删除成功: {object_key}")
-            else:
-                logger.warning(f"封面图片删除失败: {error}")
-        except Exception as e:
-            logger.warning(f"删除封面图片异常: {e}")
+        object_keys = [item['cover_image'] for item in items if item.get('cover_image')]
+        urls = {}
+        if object_keys:
+            try:
+                urls = get_storage_provider().get_urls(object_keys)
+            except Exception as e:
+                logger.warning("批量获取封面图片 URL 失败: %s", e)
 
+        for item in items:
+            item['cover_image_url'] = urls.get(item.get('cover_image'))
+        return items
+    
     def create(
         self,
         user_id: str,
@@ -114,24 +124,27 @@ class KnowledgebaseService:
             with session_scope() as session:
                 session.add(kb)
                 session.flush()  # 获取生成的 ID
-                # 在 session 内部转换为字典，避免 detached 问题
+                # 在 session 内部转换为字典（created_at 等数据库生成的值需要在会话内加载）
                 kb_dict = kb.to_dict()
-                # 转换封面图片 URL
-                kb_dict = self._convert_cover_url(kb_dict)
-                logger.info(f"知识库 {name} 创建成功，ID: {kb.id}")
-                return kb_dict, None
+                logger.info("知识库 %s 创建成功，ID: %s", name, kb.id)
+
+            # 事务提交后再转换封面图片 URL，不占用数据库连接
+            kb_dict = self._convert_cover_url(kb_dict)
+            _total_cache.pop(user_id)
+            invalidate_kb(kb.id, user_id)
+            return kb_dict, None
 
         except IntegrityError as e:
-            error_msg = str(e.orig) if hasattr(e, "orig") else str(e)
-            if "name" in error_msg.lower() or "duplicate" in error_msg.lower():
-                logger.warning(f"知识库名称 {name} 已存在")
+            # 知识库表上唯一约束只有名称
+            if is_duplicate_key(e):
+                logger.warning("知识库名称 %s 已存在", name)
                 return None, "知识库名称已存在"
             else:
-                logger.error(f"创建知识库失败: {e}")
+                logger.error("创建知识库失败: %s", e)
                 return None, "创建知识库失败"
 
         except Exception as e:
-            logger.error(f"创建知识库异常: {e}")
+            logger.error("创建知识库异常: %s", e)
             return None, "服务器内部错误"
 
     def get_by_id(
@@ -151,77 +164,112 @@ class KnowledgebaseService:
         """
         try:
             with session_scope() as session:
-                query = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id
-                )
-                # 如果传入 user_id，则加入用户过滤（权限验证）
-                if user_id:
-                    query = query.filter(Knowledgebase.user_id == user_id)
-
-                kb = query.first()
+                # 按主键获取（优先命中会话的 identity map）
+                kb = session.get(Knowledgebase, kb_id)
 
-                if not kb:
+                # 如果传入 user_id，则校验归属（权限验证）
+                if not kb or (user_id and kb.user_id != user_id):
                     return None, "知识库不存在或无权访问"
 
-                kb_dict = kb.to_dict()
-                # 转换封面图片 URL
-                kb_dict = self._convert_cover_url(kb_dict)
-                return kb_dict, None
+            # 会话关闭后转换为字典（提交不会使已加载的属性过期）
+            kb_dict = kb.to_dict()
+            # 转换封面图片 URL
+            kb_dict = self._convert_cover_url(kb_dict)
+            return kb_dict, None
 
         except Exception as e:
-            logger.error(f"查询知识库失败: {e}")
+            logger.error("查询知识库失败: %s", e)
             return None, "服务器内部错误"
 
     def get_list(
         self,
         user_id: str,
-        page: int = 1,
-        page_size: int = 10
+        page: Optional[int] = None,
+        page_size: int = 10,
+        cursor: Optional[Tuple[datetime, str]] = None,
+        with_total: bool = False
     ) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
         """
-        分页查询用户的知识库列表
+        分页查询用户的知识库列表，按创建时间倒序
+
+        默认使用游标（keyset）分页：按 (created_at, id) 定位，不扫描丢弃前序行；
+        传入 page 时使用页码分页。两种方式都多取一条记录判断是否还有下一页，
+        with_total 为 True 时额外返回总数（短期缓存，避免每次翻页都执行 COUNT）。
 
         Args:
             user_id: 用户 ID（用户隔离）
-            page: 页码，从 1 开始
+            page: 页码（仅页码分页）
             page_size: 每页数量
+            cursor: 上一页最后一条记录的 (created_at, id)，为空表示第一页
+            with_total: 是否返回总数
 
         Returns:
             (分页数据字典, 错误信息)
         """
         try:
             with session_scope() as session:
-                # 构建查询，只查询当前用户的知识库
-                query = session.query(Knowledgebase).filter(
-                    Knowledgebase.user_id == user_id
-                )
-
-                # 获取总数
-                total = query.count()
-
-                # 分页查询，按创建时间倒序
-                offset = (page - 1) * page_size
-                kbs = query.order_by(Knowledgebase.created_at.desc())\
-                    .offset(offset)\
-                    .limit(page_size)\
-                    .all()
+                # 只投影列表所需的列，不构建 ORM 对象
+                stmt = select(*_LIST_COLUMNS)\
+                    .where(Knowledgebase.user_id == user_id)\
+                    .order_by(Knowledgebase.created_at.desc(), Knowledgebase.id.desc())
+
+                total = _total_cache.get(user_id) if with_total else None
+                # 页码分页且总数未缓存时，用窗口函数随分页查询一并返回总数，省去单独的 COUNT 查询
+                window_total = page is not None and with_total and total is None
+
+                if page is not None:
+                    # 页码分页
+                    stmt = stmt.offset((page - 1) * page_size)
+                    if window_total:
+                        stmt = stmt.add_columns(func.count().over().label("_total"))
+                elif cursor is not None:
+                    # 游标分页：从上一页最后一条记录之后继续取
+                    cursor_created_at, cursor_id = cursor
+                    stmt = stmt.where(or_(
+                        Knowledgebase.created_at < cursor_created_at,
+                        and_(
+                            Knowledgebase.created_at == cursor_created_at,
+                            Knowledgebase.id < cursor_id
+                        )
+                    ))
+
+                # 多取一条判断是否还有下一页
+                rows = session.execute(stmt.limit(page_size + 1)).mappings().all()
+                has_more = len(rows) > page_size
+                rows = rows[:page_size]
 
                 # 转换为字典列表
-                items = [kb.to_dict() for kb in kbs]
+                items = [Knowledgebase.row_to_dict(row) for row in rows]
                 # 转换封面图片 URL
                 items = self._convert_cover_url_list(items)
 
                 result = {
                     "items": items,
-                    "page": page,
                     "page_size": page_size,
-                    "total": total
+                    "has_more": has_more
                 }
+                if page is not None:
+                    result["page"] = page
+                else:
+                    last = rows[-1] if has_more else None
+                    result["next_cursor"] = encode_cursor(last["created_at"], last["id"]) if last else None
+
+                if with_total:
+                    if total is None:
+                        if window_total and rows:
+                            total = rows[0]["_total"]
+                        else:
+                            # 游标分页或页码超出范围（无返回行）时单独统计
+                            total = session.query(Knowledgebase.id).filter(
+                                Knowledgebase.user_id == user_id
+                            ).count()
+                        _total_cache.set(user_id, total)
+                    result["total"] = total
 
                 return result, None
 
         except Exception as e:
-            logger.error(f"查询知识库列表失败: {e}")
+            logger.error("查询知识库列表失败: %s", e)
             return None, "服务器内部错误"
 
     def update(
@@ -241,76 +289,95 @@ class KnowledgebaseService:
         Returns:
             (更新后的知识库信息, 错误信息)
         """
-        # 允许更新的字段
-        allowed_fields = {"name", "description", "chunk_size", "chunk_overlap", "cover_image"}
         # 过滤掉不允许更新的字段
-        update_data = {k: v for k, v in update_data.items() if k in allowed_fields}
+        update_data = {k: v for k, v in update_data.items() if k in _UPDATE_FIELDS}
 
         if not update_data:
             return None, "没有有效的更新字段"
 
+        new_chunk_size = update_data.get("chunk_size")
+        new_chunk_overlap = update_data.get("chunk_overlap")
+        if new_chunk_size is not None and new_chunk_overlap is not None \
+                and new_chunk_overlap >= new_chunk_size:
+            return None, "分块重叠大小不能大于等于分块大小"
+
         # 用于记录需要在事务成功后删除的图片
         image_to_delete = None
         kb_dict = None
 
         try:
             with session_scope() as session:
-                # 查询并验证权限
-                kb = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id,
-                    Knowledgebase.user_id == user_id
-                ).first()
-
-                if not kb:
-                    return None, "知识库不存在或无权操作"
-
-                # 校验 chunk_overlap < chunk_size（结合数据库现有值）
-                new_chunk_size = update_data.get("chunk_size", kb.chunk_size)
-                new_chunk_overlap = update_data.get("chunk_overlap", kb.chunk_overlap)
-                if new_chunk_overlap >= new_chunk_size:
-                    return None, "分块重叠大小不能大于等于分块大小"
-
-                # 检查是否更换了封面图片
-                old_cover_image = kb.cover_image
-                new_cover_image = update_data.get("cover_image")
-                cover_image_changed = (
-                    "cover_image" in update_data and 
-                    old_cover_image and 
-                    new_cover_image != old_cover_image
+                owned_filter = (Knowledgebase.id == kb_id, Knowledgebase.user_id == user_id)
+
+                # 只有更换封面时才需要先读取旧封面，其余情况直接执行 UPDATE，省去一次往返
+                old_cover_image = None
+                if "cover_image" in update_data:
+                    row = session.execute(
+                        select(Knowledgebase.cover_image).where(*owned_filter)
+                    ).first()
+                    if row is None:
+                        return None, "知识库不存在或无权操作"
+                    old_cover_image = row.cover_image
+
+                # 权限条件直接放在 WHERE 中；只更新分块参数之一时，
+                # 结合数据库现有值校验 chunk_overlap < chunk_size 的条件也一并放入 WHERE
+                stmt = update(Knowledgebase).where(*owned_filter)
+                if new_chunk_size is not None and new_chunk_overlap is None:
+                    stmt = stmt.where(Knowledgebase.chunk_overlap < new_chunk_size)
+                elif new_chunk_overlap is not None and new_chunk_size is None:
+                    stmt = stmt.where(Knowledgebase.chunk_size > new_chunk_overlap)
+                # 所有字段都与现有值相同时不执行写入（前端常原样提交整个表单）
+                stmt = stmt.where(or_(*(
+                    getattr(Knowledgebase, key).is_distinct_from(value)
+                    for key, value in update_data.items()
+                )))
+
+                result = session.execute(
+                    stmt.values(**update_data).execution_options(synchronize_session=False)
                 )
 
-                # 更新字段
-                for key, value in update_data.items():
-                    setattr(kb, key, value)
+                # MySQL 不支持 UPDATE ... RETURNING，读取更新后的行（含数据库生成的 updated_at）
+                row = session.execute(
+                    select(Knowledgebase.__table__).where(*owned_filter)
+                ).mappings().first()
+                if result.rowcount == 0:
+                    # 未更新任何行：知识库不存在、分块参数校验失败，或没有实际变更
+                    if row is None:
+                        return None, "知识库不存在或无权操作"
+                    chunk_size = update_data.get("chunk_size", row["chunk_size"])
+                    chunk_overlap = update_data.get("chunk_overlap", row["chunk_overlap"])
+                    if chunk_overlap >= chunk_size:
+                        return None, "分块重叠大小不能大于等于分块大小"
+
+                kb_dict = Knowledgebase.row_to_dict(row)
+
+                # 如果更换了封面，在同一事务中登记待删除的旧图片
+                if old_cover_image and update_data["cover_image"] != old_cover_image:
+                    image_to_delete = old_cover_image
+                    record_orphans(session, [image_to_delete])
 
-                session.flush()
-                kb_dict = kb.to_dict()
-                # 转换封面图片 URL
-                kb_dict = self._convert_cover_url(kb_dict)
+                logger.info("知识库 %s 更新成功", kb_id)
 
-                # 如果更换了封面，记录待删除的旧图片
-                if cover_image_changed:
-                    image_to_delete = old_cover_image
+            # 事务提交后再转换封面图片 URL，不占用数据库连接
+            kb_dict = self._convert_cover_url(kb_dict)
 
-                logger.info(f"知识库 {kb_id} 更新成功")
-            
-            # 事务提交成功后，删除旧图片（在 session_scope 外部执行）
+            # 事务提交成功后，在后台删除旧图片，不阻塞响应
             if image_to_delete:
-                self._delete_cover_image(image_to_delete)
+                schedule_delete([image_to_delete])
             
             return kb_dict, None
 
         except IntegrityError as e:
-            error_msg = str(e.orig) if hasattr(e, "orig") else str(e)
-            if "name" in error_msg.lower() or "duplicate" in error_msg.lower():
-                logger.warning(f"知识库名称已存在")
+            # 知识库表上唯一约束只有名称
+            if is_duplicate_key(e):
+                logger.warning("知识库名称已存在")
                 return None, "知识库名称已存在"
             else:
-                logger.error(f"更新知识库失败: {e}")
+                logger.error("更新知识库失败: %s", e)
                 return None, "更新知识库失败"
 
         except Exception as e:
-            logger.error(f"更新知识库异常: {e}")
+            logger.error("更新知识库异常: %s", e)
             return None, "服务器内部错误"
 
     def delete(
@@ -328,35 +395,45 @@ class KnowledgebaseService:
         Returns:
             (是否成功, 错误信息)
         """
-        # 用于记录需要在事务成功后删除的图片
+        # 用于记录需要在事务成功后删除的封面图片和文档文件
         image_to_delete = None
+        files_to_delete = []
         kb_name = None
         
         try:
             with session_scope() as session:
-                # 查询并验证权限
-                kb = session.query(Knowledgebase).filter(
-                    Knowledgebase.id == kb_id,
-                    Knowledgebase.user_id == user_id
-                ).first()
+                # 按主键获取并验证权限
+                kb = session.get(Knowledgebase, kb_id)
 
-                if not kb:
+                if not kb or kb.user_id != user_id:
                     return False, "知识库不存在或无权操作"
 
                 kb_name = kb.name
                 image_to_delete = kb.cover_image
+                # 文档记录由外键级联删除，这里先收集其存储文件
+                # 只取单列，不构建 ORM 对象；路径列表在事务提交后还要用于删除文件，需要完整保留
+                file_paths = session.execute(
+                    select(Document.file_path).where(Document.kb_id == kb_id)
+                ).scalars()
+                files_to_delete = [file_path for file_path in file_paths if file_path]
+                if image_to_delete:
+                    files_to_delete.append(image_to_delete)
                 session.delete(kb)
+                # 与知识库记录的删除在同一事务中登记待清理文件
+                record_orphans(session, files_to_delete)
 
-                logger.info(f"知识库 {kb_name}({kb_id}) 删除成功")
-            
-            # 事务提交成功后，删除关联的封面图片（在 session_scope 外部执行）
-            if image_to_delete:
-                self._delete_cover_image(image_to_delete)
+                logger.info("知识库 %s(%s) 删除成功", kb_name, kb_id)
+
+            _total_cache.pop(user_id)
+            invalidate_kb(kb_id, user_id)
+
+            # 事务提交成功后，在后台一次批量删除封面图片和文档文件，不阻塞响应
+            schedule_delete(files_to_delete)
             
             return True, None
 
         except Exception as e:
-            logger.error(f"删除知识库异常: {e}")
+            logger.error("删除知识库异常: %s", e)
             return False, "服务器内部错误"
 
 
@@ -56,7 +56,7 @@ class DocxParser(BaseParser):
                         paragraphs.append(' | '.join(row_text))
 
             content = '\n\n'.join(paragraphs)
-            logger.debug(f"DOCX 文件解析成功: {file_path}, 段落数: {len(paragraphs)}")
+            logger.debug("DOCX 文件解析成功: %s, 段落数: %s", file_path, len(paragraphs))
 
             return content, None
 
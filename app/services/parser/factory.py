@@ -64,7 +64,7 @@ def get_parser(file_type: str) -> BaseParser:
         raise ValueError(f"不支持的文件类型: {file_type}")
 
     parser_class = _load_parser_class(class_path)
-    logger.debug(f"获取解析器: file_type={file_type}, parser={parser_class.__name__}")
+    logger.debug("获取解析器: file_type=%s, parser=%s", file_type, parser_class.__name__)
 
     return parser_class()
 
@@ -46,7 +46,7 @@ class PDFParser(BaseParser):
             doc.close()
 
             content = '\n\n'.join(pages_content)
-            logger.debug(f"PDF 文件解析成功: {file_path}, 页数: {len(pages_content)}")
+            logger.debug("PDF 文件解析成功: %s, 页数: %s", file_path, len(pages_content))
 
             return content, None
 
@@ -40,7 +40,7 @@ class TxtParser(BaseParser):
             try:
                 with open(file_path, 'r', encoding=encoding) as f:
                     content = f.read()
-                logger.debug(f"TXT 文件解析成功: {file_path}, encoding={encoding}")
+                logger.debug("TXT 文件解析成功: %s, encoding=%s", file_path, encoding)
                 return content, None
             except UnicodeDecodeError:
                 continue
@@ -6,13 +6,53 @@
 
 from typing import Dict, Any, Tuple, Optional
 
+from sqlalchemy import func, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+
 from app.models.settings import Settings
 from app.util.db import session_scope
 from app.util.logger import get_logger
+from app.util.ttl_cache import TTLCache
 
 
 logger = get_logger(__name__)
 
+# 设置缓存：每次 RAG/对话请求都会读取设置，而设置很少修改；
+# 本进程更新时直接刷新缓存，TTL 兜底其他进程的修改
+SETTINGS_CACHE_TTL = 30
+_SETTINGS_KEY = "global"
+_settings_cache = TTLCache(ttl=SETTINGS_CACHE_TTL, maxsize=1)
+
+# 允许更新的字段
+_ALLOWED_FIELDS = frozenset({
+    "embedding_provider",
+    "embedding_model_name",
+    "embedding_api_key",
+    "embedding_base_url",
+    "llm_provider",
+    "llm_model_name",
+    "llm_api_key",
+    "llm_base_url",
+    "llm_temperature",
+    "chat_system_prompt",
+    "rag_system_prompt",
+    "rag_query_prompt",
+    "retrieval_mode",
+    "vector_threshold",
+    "keyword_threshold",
+    "vector_weight",
+    "top_k",
+})
+
+# 数值字段校验规则: (字段, 类型转换, 最小值, 最大值, 超出范围提示, 格式错误提示)
+_NUMERIC_RULES = (
+    ("vector_threshold", float, 0, 1, "向量检索阈值应在 0-1 之间", "向量检索阈值格式错误"),
+    ("keyword_threshold", float, 0, 1, "全文检索阈值应在 0-1 之间", "全文检索阈值格式错误"),
+    ("vector_weight", float, 0, 1, "向量检索权重应在 0-1 之间", "向量检索权重格式错误"),
+    ("top_k", int, 1, 50, "TopK 应在 1-50 之间", "TopK 格式错误"),
+    ("llm_temperature", float, 0, 2, "温度应在 0-2 之间", "温度格式错误"),
+)
+
 
 class SettingsService:
     """设置服务类"""
@@ -56,15 +96,23 @@ class SettingsService:
         Returns:
             (设置字典, 错误信息) - 成功时错误信息为 None
         """
+        cached = _settings_cache.get(_SETTINGS_KEY)
+        if cached is not None:
+            # 返回副本，避免调用方修改缓存内容
+            return dict(cached), None
+
         try:
             with session_scope() as session:
                 settings = session.query(Settings).filter_by(id="global").first()
                 
                 if settings:
-                    return settings.to_dict(), None
+                    result = settings.to_dict()
                 else:
                     # 返回默认设置
-                    return self._get_default_settings(), None
+                    result = self._get_default_settings()
+
+            _settings_cache.set(_SETTINGS_KEY, result)
+            return dict(result), None
                     
         except Exception as e:
             logger.error(f"获取设置失败: {e}")
@@ -80,29 +128,8 @@ class SettingsService:
         Returns:
             (更新后的设置字典, 错误信息) - 成功时错误信息为 None
         """
-        # 允许更新的字段
-        allowed_fields = {
-            "embedding_provider",
-            "embedding_model_name",
-            "embedding_api_key",
-            "embedding_base_url",
-            "llm_provider",
-            "llm_model_name",
-            "llm_api_key",
-            "llm_base_url",
-            "llm_temperature",
-            "chat_system_prompt",
-            "rag_system_prompt",
-            "rag_query_prompt",
-            "retrieval_mode",
-            "vector_threshold",
-            "keyword_threshold",
-            "vector_weight",
-            "top_k",
-        }
-
         # 过滤掉不允许更新的字段
-        update_data = {k: v for k, v in data.items() if k in allowed_fields}
+        update_data = {k: v for k, v in data.items() if k in _ALLOWED_FIELDS}
 
         if not update_data:
             return None, "没有有效的更新字段"
@@ -113,47 +140,19 @@ class SettingsService:
                 return None, "无效的检索模式"
 
         # 验证数值范围
-        if "vector_threshold" in update_data:
-            try:
-                val = float(update_data["vector_threshold"])
-                if not (0 <= val <= 1):
-                    return None, "向量检索阈值应在 0-1 之间"
-            except (TypeError, ValueError):
-                return None, "向量检索阈值格式错误"
-
-        if "keyword_threshold" in update_data:
-            try:
-                val = float(update_data["keyword_threshold"])
-                if not (0 <= val <= 1):
-                    return None, "全文检索阈值应在 0-1 之间"
-            except (TypeError, ValueError):
-                return None, "全文检索阈值格式错误"
-
-        if "vector_weight" in update_data:
-            try:
-                val = float(update_data["vector_weight"])
-                if not (0 <= val <= 1):
-                    return None, "向量检索权重应在 0-1 之间"
-            except (TypeError, ValueError):
-                return None, "向量检索权重格式错误"
-
-        if "top_k" in update_data:
+        for key, caster, low, high, range_error, format_error in _NUMERIC_RULES:
+            if key not in update_data:
+                continue
             try:
-                val = int(update_data["top_k"])
-                if not (1 <= val <= 50):
-                    return None, "TopK 应在 1-50 之间"
+                val = caster(update_data[key])
             except (TypeError, ValueError):
-                return None, "TopK 格式错误"
+                return None, format_error
+            if not (low <= val <= high):
+                return None, range_error
 
         if "llm_temperature" in update_data:
-            try:
-                val = float(update_data["llm_temperature"])
-                if not (0 <= val <= 2):
-                    return None, "温度应在 0-2 之间"
-                # 转换为字符串存储（数据库字段是 String 类型）
-                update_data["llm_temperature"] = str(val)
-            except (TypeError, ValueError):
-                return None, "温度格式错误"
+            # 转换为字符串存储（数据库字段是 String 类型）
+            update_data["llm_temperature"] = str(float(update_data["llm_temperature"]))
 
         # 验证 embedding_model_name 不能为空（数据库 nullable=False）
         if "embedding_model_name" in update_data:
@@ -162,29 +161,29 @@ class SettingsService:
 
         try:
             with session_scope() as session:
-                # 查询现有设置
-                settings = session.query(Settings).filter_by(id="global").first()
-                
-                if not settings:
-                    # 如果不存在，创建新记录
-                    settings = Settings(id="global")
-                    # 先设置默认值
-                    default_settings = self._get_default_settings()
-                    for key, value in default_settings.items():
-                        if hasattr(settings, key) and key != "id":
-                            setattr(settings, key, value)
-                    session.add(settings)
-                
-                # 更新字段
-                for key, value in update_data.items():
-                    if hasattr(settings, key):
-                        setattr(settings, key, value)
-                
-                session.flush()
-                result = settings.to_dict()
+                # 单条 INSERT ... ON DUPLICATE KEY UPDATE：记录不存在时按默认值创建，
+                # 存在时只覆盖提交的字段，省去先查询再更新的往返
+                values = self._get_default_settings()
+                values.update(update_data)
+                stmt = mysql_insert(Settings).values(**values)
+                stmt = stmt.on_duplicate_key_update(
+                    # ON DUPLICATE KEY UPDATE 不会触发 onupdate，需显式更新 updated_at
+                    updated_at=func.now(),
+                    **update_data
+                )
+                session.execute(stmt)
+
+                # MySQL 不支持 RETURNING，读取更新后的记录
+                row = session.execute(
+                    select(Settings.__table__).where(Settings.id == _SETTINGS_KEY)
+                ).mappings().one()
+                result = Settings.row_to_dict(row)
                 
                 logger.info("设置更新成功")
-                return result, None
+
+            # 事务提交后刷新缓存
+            _settings_cache.set(_SETTINGS_KEY, result)
+            return dict(result), None
 
         except Exception as e:
             logger.error(f"更新设置失败: {e}")
@@ -4,8 +4,10 @@
 定义所有存储实现必须遵循的接口规范
 """
 
+import uuid
 from abc import ABC, abstractmethod
-from typing import Tuple, Optional, BinaryIO
+from datetime import datetime
+from typing import Tuple, Optional, BinaryIO, List, Dict
 
 
 class BaseStorageProvider(ABC):
@@ -55,6 +57,30 @@ class BaseStorageProvider(ABC):
         """
         pass
     
+    def delete_many(self, object_keys: List[str]) -> Tuple[List[str], Optional[str]]:
+        """
+        批量删除文件
+
+        默认实现逐个调用 delete，子类可以覆盖为后端的批量接口。
+
+        Args:
+            object_keys: 文件标识列表
+
+        Returns:
+            Tuple[List[str], Optional[str]]: (failed_keys, error)
+            - 全部成功时: ([], None)
+            - 部分失败时: (删除失败的文件标识列表, 第一个错误信息)
+        """
+        failed_keys = []
+        first_error = None
+        for object_key in object_keys:
+            success, error = self.delete(object_key)
+            if not success:
+                failed_keys.append(object_key)
+                if first_error is None:
+                    first_error = error
+        return failed_keys, first_error
+
     @abstractmethod
     def get_url(self, object_key: str, expires: int = 3600) -> Optional[str]:
         """
@@ -69,6 +95,20 @@ class BaseStorageProvider(ABC):
         """
         pass
     
+    def get_urls(self, object_keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        批量获取文件访问 URL（使用各实现 get_url 的默认有效期）
+
+        重复的 object_key 只生成一次；默认实现逐个调用 get_url，子类可以覆盖为批量实现。
+
+        Args:
+            object_keys: 文件标识列表
+
+        Returns:
+            Dict[str, Optional[str]]: object_key -> URL，获取失败为 None
+        """
+        return {object_key: self.get_url(object_key) for object_key in dict.fromkeys(object_keys)}
+
     @abstractmethod
     def exists(self, object_key: str) -> bool:
         """
@@ -110,13 +150,11 @@ class BaseStorageProvider(ABC):
         Returns:
             str: 生成的 object_key
         """
-        import uuid
-        import os
-        from datetime import datetime
-        
-        # 获取文件扩展名
-        ext = os.path.splitext(filename)[1].lower()
-        if not ext:
+        # 获取文件扩展名（与 os.path.splitext 一致：忽略以点开头的文件名和目录中的点）
+        dot = filename.rfind('.')
+        if dot > 0 and filename[dot - 1] != '/' and '/' not in filename[dot:]:
+            ext = filename[dot:].lower()
+        else:
             ext = '.bin'
         
         # 生成唯一标识
@@ -4,6 +4,7 @@
 根据配置返回相应的存储提供者实例
 """
 
+import threading
 from typing import Optional
 
 from app.config import Config
@@ -15,6 +16,7 @@ logger = get_logger(__name__)
 
 # 存储提供者单例缓存
 _storage_provider: Optional[BaseStorageProvider] = None
+_storage_provider_lock = threading.Lock()
 
 
 def get_storage_provider() -> BaseStorageProvider:
@@ -36,21 +38,26 @@ def get_storage_provider() -> BaseStorageProvider:
     if _storage_provider is not None:
         return _storage_provider
     
-    storage_type = Config.STORAGE_TYPE.lower()
-    logger.info(f"初始化存储提供者，类型: {storage_type}")
-    
-    if storage_type == 'local':
-        from app.services.storage.local_storage import LocalStorageProvider
-        _storage_provider = LocalStorageProvider()
+    # 双重检查，避免并发的首批请求重复创建客户端
+    with _storage_provider_lock:
+        if _storage_provider is not None:
+            return _storage_provider
         
-    elif storage_type == 'minio':
-        from app.services.storage.minio_storage import MinIOStorageProvider
-        _storage_provider = MinIOStorageProvider()
+        storage_type = Config.STORAGE_TYPE.lower()
+        logger.info(f"初始化存储提供者，类型: {storage_type}")
         
-    else:
-        raise ValueError(f"不支持的存储类型: {storage_type}，请使用 'local' 或 'minio'")
-    
-    return _storage_provider
+        if storage_type == 'local':
+            from app.services.storage.local_storage import LocalStorageProvider
+            _storage_provider = LocalStorageProvider()
+            
+        elif storage_type == 'minio':
+            from app.services.storage.minio_storage import MinIOStorageProvider
+            _storage_provider = MinIOStorageProvider()
+            
+        else:
+            raise ValueError(f"不支持的存储类型: {storage_type}，请使用 'local' 或 'minio'")
+        
+        return _storage_provider
 
 
 def reset_storage_provider() -> None:
@@ -60,5 +67,6 @@ def reset_storage_provider() -> None:
     主要用于测试场景，允许重新初始化存储提供者
     """
     global _storage_provider
-    _storage_provider = None
+    with _storage_provider_lock:
+        _storage_provider = None
     logger.info("存储提供者已重置")
@@ -4,10 +4,12 @@
 将文件存储到服务器本地磁盘，通过 Flask API 提供访问
 """
 
+import io
 import os
-from typing import Tuple, Optional, BinaryIO
+import shutil
+from typing import Tuple, Optional, BinaryIO, List, Dict
 
-from flask import request
+from flask import has_request_context, request
 
 from app.services.storage.base import BaseStorageProvider
 from app.config import Config
@@ -16,6 +18,50 @@ from app.util.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 文件写入时的复制缓冲区大小（1MB）
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def _disk_fileno(stream: BinaryIO) -> Optional[int]:
+    """
+    获取上传流底层磁盘文件的描述符，不是磁盘文件时返回 None
+
+    只使用公开的 fileno()：BytesIO 等内存流会抛出 UnsupportedOperation。
+    """
+    try:
+        return stream.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+
+
+def _copy_stream(src: BinaryIO, dst, file_size: int) -> None:
+    """
+    将上传流写入目标文件
+
+    超过一个缓冲区的文件在源是磁盘文件时使用 os.copy_file_range 在内核中完成复制（Linux），
+    否则或复制未完成时，从当前位置以 1MB 缓冲分块复制剩余内容。
+    Werkzeug 用 SpooledTemporaryFile 接收上传文件，500KB 以内留在内存中，对其调用 fileno()
+    会强制写入临时文件；这些小文件一次缓冲复制即可完成，因此不走内核复制。
+    """
+    if file_size > COPY_BUFFER_SIZE and hasattr(os, "copy_file_range"):
+        src_fd = _disk_fileno(src)
+        if src_fd is not None:
+            offset = src.tell()
+            remaining = file_size - offset
+            try:
+                while remaining > 0:
+                    copied = os.copy_file_range(src_fd, dst.fileno(), remaining, offset_src=offset)
+                    if copied == 0:
+                        break
+                    offset += copied
+                    remaining -= copied
+            except OSError as e:
+                logger.debug("copy_file_range 不可用，改用缓冲复制: %s", e)
+            # 按已复制的位置继续（全部复制完成时为空操作）
+            src.seek(offset)
+
+    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+
 
 class LocalStorageProvider(BaseStorageProvider):
     """本地存储提供者
@@ -30,6 +76,9 @@ class LocalStorageProvider(BaseStorageProvider):
         """
         self.upload_dir = os.path.abspath(Config.LOCAL_UPLOAD_DIR)
         self._ensure_dir_exists(self.upload_dir)
+        # 不在请求上下文中时使用的基础 URL，由配置决定，初始化时计算一次
+        host = '127.0.0.1' if Config.APP_HOST == '0.0.0.0' else Config.APP_HOST
+        self._static_base_url = f"http://{host}:{Config.APP_PORT}"
         logger.info(f"本地存储初始化完成，上传目录: {self.upload_dir}")
     
     def _ensure_dir_exists(self, dir_path: str) -> None:
@@ -76,13 +125,7 @@ class LocalStorageProvider(BaseStorageProvider):
             
             # 写入文件
             with open(full_path, 'wb') as f:
-                # 分块读取写入，避免大文件占用过多内存
-                chunk_size = 8192
-                while True:
-                    chunk = file_data.read(chunk_size)
-                    if not chunk:
-                        break
-                    f.write(chunk)
+                _copy_stream(file_data, f, file_size)
             
             logger.info(f"文件上传成功: {object_key}")
             return object_key, None
@@ -112,14 +155,15 @@ class LocalStorageProvider(BaseStorageProvider):
         try:
             full_path = self._get_full_path(object_key)
             
-            if os.path.exists(full_path):
+            try:
                 os.remove(full_path)
+            except FileNotFoundError:
+                logger.warning(f"文件不存在，跳过删除: {object_key}")
+            else:
                 logger.info(f"文件删除成功: {object_key}")
                 
                 # 尝试删除空目录
                 self._cleanup_empty_dirs(os.path.dirname(full_path))
-            else:
-                logger.warning(f"文件不存在，跳过删除: {object_key}")
             
             return True, None
             
@@ -133,25 +177,23 @@ class LocalStorageProvider(BaseStorageProvider):
             return False, error_msg
     
     def _cleanup_empty_dirs(self, dir_path: str) -> None:
-        """递归删除空目录"""
-        try:
-            # 不删除根上传目录
-            if os.path.normpath(dir_path) == os.path.normpath(self.upload_dir):
-                return
-                
-            if os.path.exists(dir_path) and not os.listdir(dir_path):
+        """逐级向上删除空目录，到上传根目录或遇到非空目录为止"""
+        # 直接 rmdir，非空目录由系统调用报错，无需先 exists + listdir
+        dir_path = os.path.normpath(dir_path)
+        while dir_path.startswith(self.upload_dir + os.sep):
+            try:
                 os.rmdir(dir_path)
-                logger.debug(f"删除空目录: {dir_path}")
-                # 递归检查父目录
-                self._cleanup_empty_dirs(os.path.dirname(dir_path))
-        except Exception:
-            pass  # 忽略清理空目录时的错误
+            except OSError:
+                return  # 目录非空或已被删除
+            logger.debug("删除空目录: %s", dir_path)
+            dir_path = os.path.dirname(dir_path)
     
     def get_url(self, object_key: str, expires: int = 3600) -> Optional[str]:
         """
         获取文件访问 URL
         
         本地存储通过 Flask API 提供访问，URL 格式为: /api/files/{object_key}
+        与 MinIO 预签名 URL 一致，不检查文件是否存在，文件缺失时由访问接口返回 404
         
         Args:
             object_key: 文件标识
@@ -163,25 +205,29 @@ class LocalStorageProvider(BaseStorageProvider):
         if not object_key:
             return None
             
-        # 检查文件是否存在
-        if not self.exists(object_key):
-            logger.warning(f"文件不存在: {object_key}")
-            return None
-        
-        # 构建访问 URL
-        # 尝试从 Flask 请求上下文获取基础 URL
-        try:
-            base_url = request.host_url.rstrip('/')
-        except RuntimeError:
-            # 不在请求上下文中，使用配置
-            host = Config.APP_HOST
-            port = Config.APP_PORT
-            if host == '0.0.0.0':
-                host = '127.0.0.1'
-            base_url = f"http://{host}:{port}"
-        
-        url = f"{base_url}/api/upload/files/{object_key}"
-        return url
+        return f"{self._base_url()}/api/upload/files/{object_key}"
+
+    def get_urls(self, object_keys: List[str]) -> Dict[str, Optional[str]]:
+        """
+        批量获取文件访问 URL，基础 URL 只计算一次
+
+        Args:
+            object_keys: 文件标识列表
+
+        Returns:
+            object_key -> URL
+        """
+        prefix = f"{self._base_url()}/api/upload/files/"
+        return {
+            object_key: f"{prefix}{object_key}" if object_key else None
+            for object_key in dict.fromkeys(object_keys)
+        }
+
+    def _base_url(self) -> str:
+        """获取访问 URL 的基础部分：请求上下文中使用请求的 host，否则使用配置"""
+        if has_request_context():
+            return request.host_url.rstrip('/')
+        return self._static_base_url
     
     def exists(self, object_key: str) -> bool:
         """
@@ -196,8 +242,8 @@ class LocalStorageProvider(BaseStorageProvider):
         if not object_key:
             return False
             
-        full_path = self._get_full_path(object_key)
-        return os.path.exists(full_path) and os.path.isfile(full_path)
+        # isfile 只需一次 stat，不存在时返回 False
+        return os.path.isfile(self._get_full_path(object_key))
     
     def get_file_path(self, object_key: str) -> Optional[str]:
         """
@@ -213,7 +259,5 @@ class LocalStorageProvider(BaseStorageProvider):
             return None
             
         full_path = self._get_full_path(object_key)
-        if os.path.exists(full_path) and os.path.isfile(full_path):
-            return full_path
-        return None
+        return full_path if os.path.isfile(full_path) else None
 
@@ -4,17 +4,40 @@ MinIO 对象存储实现
 使用 MinIO SDK 实现文件的上传、下载和管理
 """
 
+import math
+import os
 from datetime import timedelta
-from typing import Tuple, Optional, BinaryIO
+from typing import Tuple, Optional, BinaryIO, List
 from io import BytesIO
 
 from app.services.storage.base import BaseStorageProvider
 from app.config import Config
 from app.util.logger import get_logger
+from app.util.ttl_cache import TTLCache
 
 
 logger = get_logger(__name__)
 
+# 分片上传的分片大小（8MB），大文件直接按分片从请求流读取上传
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+# 超过 64MB 的文件使用 16MB 分片，减少分片请求数
+LARGE_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+LARGE_UPLOAD_PART_SIZE = 16 * 1024 * 1024
+# S3 协议单个对象最多 10000 个分片
+MAX_MULTIPART_COUNT = 10000
+
+# 预签名 URL 默认有效期（7 天）
+DEFAULT_URL_EXPIRES = 604800
+# 默认有效期的预签名 URL 缓存时间（1 小时），缓存命中时 URL 至少还有 6 天有效期
+URL_CACHE_TTL = 3600
+
+
+def _part_size(file_size: int) -> int:
+    """根据文件大小选择分片大小"""
+    if file_size > LARGE_UPLOAD_THRESHOLD:
+        return max(LARGE_UPLOAD_PART_SIZE, math.ceil(file_size / MAX_MULTIPART_COUNT))
+    return UPLOAD_PART_SIZE
+
 
 class MinIOStorageProvider(BaseStorageProvider):
     """MinIO 存储提供者
@@ -26,6 +49,8 @@ class MinIOStorageProvider(BaseStorageProvider):
     def __init__(self):
         """初始化 MinIO 客户端"""
         try:
+            import certifi
+            import urllib3
             from minio import Minio
         except ImportError:
             raise ImportError(
@@ -45,13 +70,31 @@ class MinIOStorageProvider(BaseStorageProvider):
             )
         
         # 创建客户端
+        # 连接池参数与 SDK 默认一致，仅放大 maxsize，避免并发请求时反复新建连接
+        timeout = timedelta(minutes=5).seconds
+        http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(connect=timeout, read=timeout),
+            maxsize=Config.MINIO_POOL_MAXSIZE,
+            block=False,
+            cert_reqs='CERT_REQUIRED',
+            ca_certs=os.environ.get('SSL_CERT_FILE') or certifi.where(),
+            retries=urllib3.Retry(
+                total=5,
+                backoff_factor=0.2,
+                status_forcelist=[500, 502, 503, 504]
+            )
+        )
         self.client = Minio(
             endpoint=self.endpoint,
             access_key=self.access_key,
             secret_key=self.secret_key,
-            secure=self.secure
+            secure=self.secure,
+            http_client=http_client
         )
         
+        # 预签名 URL 缓存，列表页重复展示同一封面时避免重复签名
+        self._url_cache = TTLCache(ttl=URL_CACHE_TTL, maxsize=10000)
+
         # 确保桶存在
         self._ensure_bucket_exists()
         
@@ -100,7 +143,10 @@ class MinIOStorageProvider(BaseStorageProvider):
                 object_name=object_key,
                 data=file_data,
                 length=file_size,
-                content_type=content_type
+                content_type=content_type,
+                part_size=_part_size(file_size),
+                # 各分片的读取、校验和计算与上传在线程池中并行（hashlib 计算时释放 GIL）
+                num_parallel_uploads=Config.MINIO_PARALLEL_UPLOADS
             )
             
             logger.info(f"MinIO 上传成功: {object_key}, etag: {result.etag}")
@@ -126,6 +172,7 @@ class MinIOStorageProvider(BaseStorageProvider):
             
         try:
             self.client.remove_object(self.bucket_name, object_key)
+            self._url_cache.pop(object_key)
             logger.info(f"MinIO 删除成功: {object_key}")
             return True, None
             
@@ -134,11 +181,54 @@ class MinIOStorageProvider(BaseStorageProvider):
             error_msg = f"MinIO 删除失败: {str(e)}"
             logger.error(error_msg)
             return False, error_msg
+
+    def delete_many(self, object_keys: List[str]) -> Tuple[List[str], Optional[str]]:
+        """
+        批量删除 MinIO 文件
+
+        使用 remove_objects，SDK 每 1000 个对象合并为一个删除请求。
+
+        Args:
+            object_keys: 文件标识列表
+
+        Returns:
+            (failed_keys, error)：删除失败的文件标识列表及首个错误信息，全部成功时为 ([], None)
+        """
+        object_keys = [object_key for object_key in dict.fromkeys(object_keys) if object_key]
+        if not object_keys:
+            return [], None
+
+        from minio.deleteobjects import DeleteObject
+
+        try:
+            # remove_objects 惰性执行，遍历返回的错误迭代器时才会发出删除请求
+            errors = list(self.client.remove_objects(
+                self.bucket_name,
+                (DeleteObject(object_key) for object_key in object_keys)
+            ))
+        except Exception as e:
+            error_msg = f"MinIO 批量删除失败: {str(e)}"
+            logger.error(error_msg)
+            return object_keys, error_msg
+
+        for object_key in object_keys:
+            self._url_cache.pop(object_key)
+
+        if errors:
+            failed_keys = list(dict.fromkeys(error.name for error in errors))
+            error_msg = f"MinIO 批量删除失败: {len(failed_keys)} 个，首个 {errors[0].name}: {errors[0].message}"
+            logger.error(error_msg)
+            return failed_keys, error_msg
+
+        logger.info(f"MinIO 批量删除成功: {len(object_keys)} 个")
+        return [], None
     
-    def get_url(self, object_key: str, expires: int = 604800) -> Optional[str]:
+    def get_url(self, object_key: str, expires: int = DEFAULT_URL_EXPIRES) -> Optional[str]:
         """
         获取预签名访问 URL
         
+        默认有效期的 URL 会缓存 URL_CACHE_TTL 秒，指定其他有效期时每次重新签名。
+        
         Args:
             object_key: 文件标识
             expires: URL 有效期（秒），默认 7 天
@@ -149,6 +239,12 @@ class MinIOStorageProvider(BaseStorageProvider):
         """
         if not object_key:
             return None
+
+        cacheable = expires == DEFAULT_URL_EXPIRES
+        if cacheable:
+            url = self._url_cache.get(object_key)
+            if url is not None:
+                return url
             
         try:
             url = self.client.presigned_get_object(
@@ -156,6 +252,8 @@ class MinIOStorageProvider(BaseStorageProvider):
                 object_name=object_key,
                 expires=timedelta(seconds=expires)
             )
+            if cacheable:
+                self._url_cache.set(object_key, url)
             return url
             
         except Exception as e:
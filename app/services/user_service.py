@@ -7,8 +7,10 @@
 import bcrypt
 from typing import Optional, Tuple, Dict, Any
 
+from sqlalchemy import bindparam, select
 from sqlalchemy.exc import IntegrityError
 
+from app.config import Config
 from app.models.user import User
 from app.util.db import session_scope
 from app.util.logger import get_logger
@@ -16,13 +18,38 @@ from app.util.logger import get_logger
 
 logger = get_logger(__name__)
 
+# argon2 哈希的前缀（bcrypt 哈希以 $2a$/$2b$ 开头）
+_ARGON2_PREFIX = "$argon2"
+_BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+_BCRYPT_HASH_LENGTH = 60
+
+_argon2_hasher = None
+
+# 预构建的按用户名/邮箱查询语句，参数在执行时绑定，编译结果由引擎的语句缓存复用
+_SELECT_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+_SELECT_BY_EMAIL = select(User).where(User.email == bindparam("email"))
+
+
+def _get_argon2_hasher():
+    """获取 argon2id 哈希器（首次使用时创建）"""
+    global _argon2_hasher
+    if _argon2_hasher is None:
+        try:
+            from argon2 import PasswordHasher
+        except ImportError:
+            raise ImportError(
+                "argon2-cffi 未安装，请运行: pip install argon2-cffi"
+            )
+        _argon2_hasher = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+    return _argon2_hasher
+
 
 class UserService:
     """用户服务类"""
 
     def hash_password(self, password: str) -> str:
         """
-        使用 bcrypt 加密密码
+        加密密码（算法由 Config.PASSWORD_HASHER 决定）
 
         Args:
             password: 明文密码
@@ -30,13 +57,16 @@ class UserService:
         Returns:
             加密后的密码哈希
         """
-        salt = bcrypt.gensalt()
+        if Config.PASSWORD_HASHER == "argon2":
+            return _get_argon2_hasher().hash(password)
+
+        salt = bcrypt.gensalt(rounds=Config.BCRYPT_ROUNDS)
         hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
         return hashed.decode("utf-8")
 
     def verify_password(self, password: str, password_hash: str) -> bool:
         """
-        验证密码
+        验证密码（按存储哈希的前缀识别 argon2 / bcrypt）
 
         Args:
             password: 明文密码
@@ -45,7 +75,26 @@ class UserService:
         Returns:
             密码是否正确
         """
+        if not password_hash:
+            return False
+
+        is_argon2 = password_hash.startswith(_ARGON2_PREFIX)
+        if not is_argon2 and (
+            not password_hash.startswith(_BCRYPT_PREFIXES)
+            or len(password_hash) != _BCRYPT_HASH_LENGTH
+        ):
+            # 格式不合法的哈希不可能匹配，无需进入昂贵的哈希计算
+            logger.warning("密码哈希格式无效")
+            return False
+
         try:
+            if is_argon2:
+                from argon2.exceptions import VerifyMismatchError
+                try:
+                    return _get_argon2_hasher().verify(password_hash, password)
+                except VerifyMismatchError:
+                    return False
+
             return bcrypt.checkpw(
                 password.encode("utf-8"),
                 password_hash.encode("utf-8")
@@ -124,14 +173,11 @@ class UserService:
         """
         try:
             with session_scope() as session:
-                user = session.query(User).filter(
-                    User.username == username
-                ).first()
-                if user:
-                    # 确保在 session 内加载所有属性
-                    session.refresh(user)
-                    # 分离对象以便在 session 外使用
-                    session.expunge(user)
+                # username 有唯一索引，最多匹配一行
+                user = session.scalars(
+                    _SELECT_BY_USERNAME, {"username": username}
+                ).one_or_none()
+                # 会话关闭时对象自动分离，expire_on_commit=False 保证已加载属性仍可访问
                 return user
         except Exception as e:
             logger.error(f"查询用户失败: {e}")
@@ -149,12 +195,8 @@ class UserService:
         """
         try:
             with session_scope() as session:
-                user = session.query(User).filter(
-                    User.id == user_id
-                ).first()
-                if user:
-                    session.refresh(user)
-                    session.expunge(user)
+                # 按主键获取
+                user = session.get(User, user_id)
                 return user
         except Exception as e:
             logger.error(f"查询用户失败: {e}")
@@ -172,12 +214,10 @@ class UserService:
         """
         try:
             with session_scope() as session:
-                user = session.query(User).filter(
-                    User.email == email
-                ).first()
-                if user:
-                    session.refresh(user)
-                    session.expunge(user)
+                # email 有唯一索引，最多匹配一行
+                user = session.scalars(
+                    _SELECT_BY_EMAIL, {"email": email}
+                ).one_or_none()
                 return user
         except Exception as e:
             logger.error(f"查询用户失败: {e}")
@@ -202,7 +242,7 @@ class UserService:
         user = self.get_by_username(username)
 
         if not user:
-            logger.debug(f"用户 {username} 不存在")
+            logger.debug("用户 %s 不存在", username)
             return None, "用户名或密码错误"
 
         # 检查用户状态
@@ -212,7 +252,7 @@ class UserService:
 
         # 验证密码
         if not self.verify_password(password, user.password_hash):
-            logger.debug(f"用户 {username} 密码错误")
+            logger.debug("用户 %s 密码错误", username)
             return None, "用户名或密码错误"
 
         logger.info(f"用户 {username} 登录成功")
@@ -245,7 +285,7 @@ class UserService:
 
         try:
             with session_scope() as session:
-                db_user = session.query(User).filter(User.id == user_id).first()
+                db_user = session.get(User, user_id)
                 if db_user:
                     db_user.password_hash = self.hash_password(new_password)
                     logger.info(f"用户 {user.username} 密码修改成功")
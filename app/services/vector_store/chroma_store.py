@@ -62,7 +62,7 @@ class ChromaVectorStore(BaseVectorStore):
         """
         try:
             if self.collection_exists(collection_name):
-                logger.debug(f"Collection 已存在: {collection_name}")
+                logger.debug("Collection 已存在: %s", collection_name)
                 return True, None
 
             collection = self.client.create_collection(
@@ -241,7 +241,7 @@ class ChromaVectorStore(BaseVectorStore):
                         "score": 1 - results['distances'][0][i] if results.get('distances') else 0,  # 转换为相似度
                     })
 
-            logger.debug(f"向量检索完成: collection={collection_name}, results={len(items)}")
+            logger.debug("向量检索完成: collection=%s, results=%s", collection_name, len(items))
             return items, None
 
         except Exception as e:
@@ -301,7 +301,7 @@ class ChromaVectorStore(BaseVectorStore):
             end = start + page_size
             paginated_items = items[start:end]
 
-            logger.debug(f"获取分块完成: collection={collection_name}, doc_id={doc_id}, total={total}")
+            logger.debug("获取分块完成: collection=%s, doc_id=%s, total=%s", collection_name, doc_id, total)
             return paginated_items, total, None
 
         except Exception as e:
@@ -353,7 +353,7 @@ class ChromaVectorStore(BaseVectorStore):
                         "score": 1 - distance,  # 转换为相似度
                     })
 
-            logger.debug(f"文档内搜索完成: collection={collection_name}, doc_id={doc_id}, results={len(items)}")
+            logger.debug("文档内搜索完成: collection=%s, doc_id=%s, results=%s", collection_name, doc_id, len(items))
             return items, None
 
         except Exception as e:
@@ -67,7 +67,7 @@ class MilvusVectorStore(BaseVectorStore):
             self._ensure_connection()
 
             if self.collection_exists(collection_name):
-                logger.debug(f"Collection 已存在: {collection_name}")
+                logger.debug("Collection 已存在: %s", collection_name)
                 return True, None
 
             from pymilvus import Collection, FieldSchema, CollectionSchema, DataType, utility
@@ -291,7 +291,7 @@ class MilvusVectorStore(BaseVectorStore):
                         "score": hit.score,  # Milvus COSINE 直接返回相似度
                     })
 
-            logger.debug(f"向量检索完成: collection={collection_name}, results={len(items)}")
+            logger.debug("向量检索完成: collection=%s, results=%s", collection_name, len(items))
             return items, None
 
         except Exception as e:
@@ -348,7 +348,7 @@ class MilvusVectorStore(BaseVectorStore):
                     "seq": start + i + 1,  # 基于偏移量生成序号
                 })
 
-            logger.debug(f"获取分块完成: collection={collection_name}, doc_id={doc_id}, total={total}")
+            logger.debug("获取分块完成: collection=%s, doc_id=%s, total=%s", collection_name, doc_id, total)
             return items, total, None
 
         except Exception as e:
@@ -402,7 +402,7 @@ class MilvusVectorStore(BaseVectorStore):
                         "score": hit.score,
                     })
 
-            logger.debug(f"文档内搜索完成: collection={collection_name}, doc_id={doc_id}, results={len(items)}")
+            logger.debug("文档内搜索完成: collection=%s, doc_id=%s, results=%s", collection_name, doc_id, len(items))
             return items, None
 
         except Exception as e:
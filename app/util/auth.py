@@ -4,19 +4,70 @@
 提供 JWT 认证装饰器和用户获取功能
 """
 
+import time
 from functools import wraps
 from typing import Optional, Dict, Any
 
 from flask import g, request
-
-from app.util.jwt_utils import get_token_from_header, verify_token
+from jwt import InvalidTokenError
+
+from app.util.jwt_utils import (
+    PERMANENT_TOKEN_ERRORS,
+    _get_secret_key,
+    get_token_from_header,
+    verify_token,
+)
 from app.util.response import unauthorized
 from app.util.logger import get_logger
+from app.util.ttl_cache import TTLCache
 
 
 logger = get_logger(__name__)
 
 
+# 已验证 Token 的缓存时间（秒），同一 Token 在此期间内跳过签名校验
+TOKEN_CACHE_TTL = 60
+
+# 两个缓存的键均为 (签名密钥, Token)：同一进程中多个密钥不同的应用不会共用验证结果
+
+_token_cache = TTLCache(ttl=TOKEN_CACHE_TTL, maxsize=100_000)
+# 永久性验证失败（过期、签名无效、格式错误）的 Token，结果不会随时间变为有效，客户端重试时直接拒绝
+# 尚未生效等可能随时间恢复的失败不缓存
+# 单独使用较小的缓存，避免大量无效 Token 挤占有效 Token 的缓存
+_rejected_token_cache = TTLCache(ttl=TOKEN_CACHE_TTL, maxsize=1024)
+
+
+def _verify_token_cached(token: str) -> Optional[Dict[str, Any]]:
+    """
+    验证 Token（带缓存）
+
+    命中缓存时返回已解析 payload 的副本（调用方修改 g.current_user 不会污染缓存）；
+    未命中时校验签名，仅当 Token 剩余有效期超过缓存时间时才写入缓存，保证缓存不会越过过期时间。
+    永久性失败（过期、签名无效、格式错误）的 Token 记入拒绝缓存，重复提交时不再校验签名；
+    尚未生效等临时性失败不缓存，之后的请求会重新校验。
+    """
+    cache_key = (_get_secret_key(), token)
+    payload = _token_cache.get(cache_key)
+    if payload is not None:
+        return dict(payload)
+    if _rejected_token_cache.get(cache_key):
+        return None
+
+    try:
+        payload = verify_token(token, raise_errors=True)
+    except PERMANENT_TOKEN_ERRORS:
+        _rejected_token_cache.set(cache_key, True)
+        return None
+    except InvalidTokenError:
+        return None
+
+    if payload:
+        exp = payload.get("exp")
+        if isinstance(exp, (int, float)) and exp - time.time() > TOKEN_CACHE_TTL:
+            _token_cache.set(cache_key, dict(payload))
+    return payload
+
+
 def get_current_user() -> Optional[Dict[str, Any]]:
     """
     获取当前登录用户信息
@@ -64,7 +115,7 @@ def login_required(f):
             return unauthorized("缺少认证信息，请先登录")
 
         # 2. 验证 Token
-        payload = verify_token(token)
+        payload = _verify_token_cached(token)
 
         if not payload:
             logger.debug("Token 验证失败")
@@ -72,7 +123,7 @@ def login_required(f):
 
         # 3. 将用户信息存入 g 对象
         g.current_user = payload
-        logger.debug(f"用户 {payload.get('username')} 认证成功")
+        logger.debug("用户 %s 认证成功", payload.get('username'))
 
         # 4. 执行原函数
         return f(*args, **kwargs)
@@ -103,10 +154,10 @@ def login_optional(f):
         token = get_token_from_header()
 
         if token:
-            payload = verify_token(token)
+            payload = _verify_token_cached(token)
             if payload:
                 g.current_user = payload
-                logger.debug(f"用户 {payload.get('username')} 可选认证成功")
+                logger.debug("用户 %s 可选认证成功", payload.get('username'))
 
         return f(*args, **kwargs)
 
@@ -3,21 +3,86 @@
 提供数据库引擎初始化、会话管理和公共数据库操作方法
 """
 
+import threading
+import time
 from contextlib import contextmanager
-from typing import Generator, Optional
+from typing import Generator, List, Optional
 from urllib.parse import quote_plus
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect as sa_inspect, text
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateColumn
 
 from app.models.base import Base
-from app.util.logger import LoggerManager
+from app.util.logger import get_logger
 from app.config import Config
 
 
 # 获取日志器
-logger = LoggerManager().get_logger()
+logger = get_logger(__name__)
+
+
+def _execute_ddl(engine, ddl, description: str) -> bool:
+    """在独立事务中执行一条 DDL，失败时记录警告（可能已被其他进程执行）"""
+    try:
+        with engine.begin() as conn:
+            if isinstance(ddl, str):
+                conn.execute(text(ddl))
+            else:
+                ddl.create(bind=conn)
+        logger.info("数据库结构升级: %s", description)
+        return True
+    except SQLAlchemyError as e:
+        logger.warning("数据库结构升级失败: %s, %s", description, e)
+        return False
+
+
+def upgrade_schema(engine) -> List[str]:
+    """为已存在的表补齐模型中新增的列和索引（幂等）
+
+    create_all 只创建缺失的表，不会修改已有表；旧库升级后模型新增的列
+    （如 document.file_hash）缺失会导致查询报 Unknown column。
+    这里对比数据库实际结构，只补齐缺失的可空列（或带服务端默认值的列）和索引；
+    无法安全自动添加的非空列只记录警告，需手动迁移。
+
+    Args:
+        engine: 数据库引擎
+
+    Returns:
+        本次补齐的列（表名.列名）和索引名称列表
+    """
+    inspector = sa_inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+    applied = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing_columns:
+                continue
+            name = f"{table.name}.{column.name}"
+            if not column.nullable and column.server_default is None:
+                logger.warning("表 %s 缺少非空列 %s，无法自动添加，请手动迁移", table.name, column.name)
+                continue
+            column_ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            ddl = f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}"
+            if _execute_ddl(engine, ddl, f"添加列 {name}"):
+                applied.append(name)
+
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name in existing_indexes:
+                continue
+            if _execute_ddl(engine, index, f"创建索引 {index.name}"):
+                applied.append(index.name)
+
+    return applied
 
 
 class DatabaseManager:
@@ -60,7 +125,7 @@ class DatabaseManager:
         # 对密码进行 URL 编码，处理特殊字符（如 @、#、% 等）
         db_password = quote_plus(Config.DB_PASSWORD)
         db_name = Config.DB_NAME
-        url = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}?charset=utf8mb4"
+        url = f"mysql+{Config.DB_DRIVER}://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}?charset=utf8mb4"
         logger.info(f"数据库连接 URL: {url}")
         return url
 
@@ -80,19 +145,23 @@ class DatabaseManager:
         # 默认的引擎配置
         default_kwargs = {
             "poolclass": QueuePool,
-            "pool_size": 10,  # 连接池大小
-            "max_overflow": 20,  # 最大溢出连接数
-            "pool_timeout": 30,  # 获取连接超时时间(秒)
-            "pool_recycle": 3600,  # 连接回收时间(秒)，避免MySQL默认8小时断开
+            "pool_size": Config.DB_POOL_SIZE,  # 连接池大小
+            "max_overflow": Config.DB_MAX_OVERFLOW,  # 最大溢出连接数
+            "pool_timeout": Config.DB_POOL_TIMEOUT,  # 获取连接超时时间(秒)
+            "pool_recycle": Config.DB_POOL_RECYCLE,  # 连接回收时间(秒)，早于MySQL/中间网络的空闲断开
             "pool_pre_ping": True,  # 每次获取连接前ping一下，确保连接有效
-            "echo": True,  # SQL日志
+            "pool_use_lifo": True,  # 优先复用最近归还的连接，空闲连接自然过期回收
+            "echo": Config.DB_ECHO,  # SQL日志（默认关闭，每条语句都会格式化写日志）
+            "query_cache_size": 1200,  # 编译后 SQL 的缓存条目数（默认 500）
         }
         # 合并用户自定义配置
         default_kwargs.update(engine_kwargs)
 
         try:
             self._engine = create_engine(url, **default_kwargs)
-            self._session_factory = sessionmaker(bind=self._engine)
+            # 提交后不使对象过期：session_scope 在提交后立即关闭会话，
+            # 已加载的属性在会话外可直接读取，字典转换等工作可以放到事务之外
+            self._session_factory = sessionmaker(bind=self._engine, expire_on_commit=False)
             self._scoped_session = scoped_session(self._session_factory)
             logger.info("数据库引擎初始化成功")
         except Exception as e:
@@ -157,6 +226,8 @@ class DatabaseManager:
         except Exception as e:
             logger.error(f"数据库表创建失败: {e}")
             raise
+        # create_all 不会修改已存在的表，补齐模型新增的列和索引
+        upgrade_schema(self.engine)
 
     def drop_all_tables(self) -> None:
         """删除所有数据库表
@@ -223,6 +294,68 @@ def create_tables() -> None:
     db_manager.create_all_tables()
 
 
+_db_ready = threading.Event()
+_db_ready_lock = threading.Lock()
+# 初始化失败后的最短重试间隔（秒），数据库不可用期间避免每个请求都等待连接超时
+_DB_RETRY_INTERVAL = 5
+_db_last_attempt: Optional[float] = None
+
+
+def ensure_db_ready() -> None:
+    """确保数据库已初始化（进程内成功一次即可）
+
+    首次调用时初始化引擎并创建表，成功后的调用直接返回。
+    初始化失败时记录警告，之后的调用在间隔 _DB_RETRY_INTERVAL 秒后重试。
+    """
+    global _db_last_attempt
+
+    if _db_ready.is_set():
+        return
+    with _db_ready_lock:
+        if _db_ready.is_set():
+            return
+        now = time.monotonic()
+        if _db_last_attempt is not None and now - _db_last_attempt < _DB_RETRY_INTERVAL:
+            return
+        _db_last_attempt = now
+        try:
+            logger.info("初始化数据库...")
+            if db_manager._engine is None:
+                init_db()
+            create_tables()
+        except Exception as e:
+            logger.warning("数据库初始化失败，稍后重试: %s", e)
+            return
+        _db_ready.set()
+        logger.info("初始化数据库成功")
+
+
 def close_db() -> None:
     """关闭数据库连接的便捷函数"""
     db_manager.close()
+
+
+# MySQL ER_DUP_ENTRY / PostgreSQL unique_violation / SQLite UNIQUE 约束
+_MYSQL_DUP_ENTRY = 1062
+_PG_UNIQUE_VIOLATION = "23505"
+_SQLITE_CONSTRAINT_UNIQUE = "SQLITE_CONSTRAINT_UNIQUE"
+
+
+def is_duplicate_key(error: IntegrityError) -> bool:
+    """判断完整性错误是否由唯一约束冲突引起
+
+    按驱动返回的错误码判断，不解析错误信息文本
+
+    Args:
+        error: SQLAlchemy 抛出的 IntegrityError
+
+    Returns:
+        是否为唯一约束冲突
+    """
+    orig = error.orig
+    if getattr(orig, "pgcode", None) == _PG_UNIQUE_VIOLATION:
+        return True
+    if getattr(orig, "sqlite_errorname", None) == _SQLITE_CONSTRAINT_UNIQUE:
+        return True
+    args = getattr(orig, "args", None)
+    return bool(args) and args[0] == _MYSQL_DUP_ENTRY
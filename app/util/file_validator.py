@@ -7,7 +7,8 @@
 - 文件内容安全检测（Magic Number）
 """
 
-import os
+import hashlib
+from types import MappingProxyType
 from typing import Tuple, Optional, Set
 from werkzeug.datastructures import FileStorage
 
@@ -18,18 +19,64 @@ from app.util.logger import get_logger
 logger = get_logger(__name__)
 
 
-# 图片类型的 Magic Number 签名（前几个字节）
-IMAGE_SIGNATURES = {
+# 允许上传的图片 MIME 类型
+ALLOWED_IMAGE_MIME_TYPES = frozenset({
+    'image/jpeg',
+    'image/jpg',
+    'image/png',
+    'image/gif',
+    'image/webp',
+})
+
+# 按文件头前 3 字节分派的图片签名校验表（前 3 字节已能区分 JPEG/PNG/GIF/WebP），
+# 每种格式只需一次字典查找加一次剩余字节的比较（startswith 带偏移比较，不切片生成新的 bytes）
+_IMAGE_MAGIC_DISPATCH = MappingProxyType({
     # JPEG: FF D8 FF
-    b'\xff\xd8\xff': {'jpeg', 'jpg'},
+    b'\xff\xd8\xff': lambda data: True,
     # PNG: 89 50 4E 47 0D 0A 1A 0A
-    b'\x89PNG\r\n\x1a\n': {'png'},
+    b'\x89PN': lambda data: data.startswith(b'G\r\n\x1a\n', 3),
     # GIF87a / GIF89a
-    b'GIF87a': {'gif'},
-    b'GIF89a': {'gif'},
+    b'GIF': lambda data: data.startswith((b'87a', b'89a'), 3),
     # WebP: RIFF....WEBP
-    b'RIFF': {'webp'},  # 需要额外检查 WEBP 标识
-}
+    b'RIF': lambda data: data.startswith(b'F', 3) and data.startswith(b'WEBP', 8),
+})
+
+
+def _ext_index(filename: str) -> int:
+    """
+    返回扩展名起始点号的下标，无扩展名时返回 -1
+
+    结果与 os.path.splitext 一致（忽略目录中的点号和文件名开头的点号），
+    直接使用 rfind 避免 splitext 的通用路径处理开销
+    """
+    dot = filename.rfind('.')
+    if dot <= 0:
+        return -1
+    start = filename.rfind('/') + 1
+    # 文件名部分在点号之前必须有非点号字符（".bashrc"、"..png" 视为无扩展名）
+    if dot <= start or filename.count('.', start, dot) == dot - start:
+        return -1
+    return dot
+
+
+def get_extension(filename: str) -> str:
+    """获取文件扩展名（不含点号，统一转为小写，与配置中的扩展名集合直接比较）"""
+    dot = _ext_index(filename)
+    return filename[dot + 1:].lower() if dot >= 0 else ''
+
+
+def get_file_size(file: FileStorage) -> int:
+    """
+    获取上传文件大小
+
+    对 Werkzeug 已解析完成的文件流做 seek/tell，不读取文件内容。
+    不使用 multipart 分段头中的 Content-Length：该值由客户端填写，
+    与实际内容不符时会绕过大小校验，并导致按长度写入对象存储失败。
+    """
+    file.seek(0, 2)  # 移到文件末尾
+    file_size = file.tell()  # 获取文件大小
+    file.seek(0)  # 重置到文件开头
+    return file_size
 
 
 class FileValidationError(Exception):
@@ -51,7 +98,7 @@ def validate_image_extension(filename: str) -> Tuple[bool, Optional[str]]:
         return False, "文件名不能为空"
     
     # 获取扩展名（去掉点号，转小写）
-    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    ext = get_extension(filename)
     
     if not ext:
         return False, "文件没有扩展名"
@@ -101,25 +148,11 @@ def validate_image_content(file_data: bytes) -> Tuple[bool, Optional[str]]:
     if not file_data or len(file_data) < 8:
         return False, "文件内容为空或过短"
     
-    # 检查各种图片格式的 Magic Number
-    
-    # JPEG: FF D8 FF
-    if file_data[:3] == b'\xff\xd8\xff':
-        return True, None
-    
-    # PNG: 89 50 4E 47 0D 0A 1A 0A
-    if file_data[:8] == b'\x89PNG\r\n\x1a\n':
-        return True, None
-    
-    # GIF: GIF87a 或 GIF89a
-    if file_data[:6] in (b'GIF87a', b'GIF89a'):
+    # 按文件头前缀查找对应格式的校验函数（数据不足时 startswith 返回 False，校验不通过）
+    verifier = _IMAGE_MAGIC_DISPATCH.get(file_data[:3])
+    if verifier is not None and verifier(file_data):
         return True, None
     
-    # WebP: RIFF....WEBP (需要检查前 4 字节是 RIFF 且 8-12 字节是 WEBP)
-    if len(file_data) >= 12:
-        if file_data[:4] == b'RIFF' and file_data[8:12] == b'WEBP':
-            return True, None
-    
     return False, "文件内容不是有效的图片格式"
 
 
@@ -133,21 +166,13 @@ def validate_mime_type(content_type: str) -> Tuple[bool, Optional[str]]:
     Returns:
         (is_valid, error_message)
     """
-    allowed_mime_types = {
-        'image/jpeg',
-        'image/jpg',
-        'image/png',
-        'image/gif',
-        'image/webp',
-    }
-    
     if not content_type:
         return False, "缺少 Content-Type"
     
     # 取主要 MIME 类型（去掉 charset 等参数）
     main_type = content_type.split(';')[0].strip().lower()
     
-    if main_type not in allowed_mime_types:
+    if main_type not in ALLOWED_IMAGE_MIME_TYPES:
         return False, f"不支持的 MIME 类型: {main_type}"
     
     return True, None
@@ -173,7 +198,7 @@ def validate_image_file(
     filename = file.filename
     content_type = file.content_type or ''
     
-    logger.debug(f"开始校验文件: {filename}, Content-Type: {content_type}")
+    logger.debug("开始校验文件: %s, Content-Type: %s", filename, content_type)
     
     # 1. 校验扩展名
     valid, error = validate_image_extension(filename)
@@ -185,30 +210,31 @@ def validate_image_file(
     if not valid:
         return False, error, None
     
-    # 3. 读取文件内容并校验大小
-    # 先读取文件内容
-    file.seek(0, 2)  # 移到文件末尾
-    file_size = file.tell()  # 获取文件大小
-    file.seek(0)  # 重置到文件开头
-    
-    valid, error = validate_image_size(file_size)
-    if not valid:
-        return False, error, file_size
-    
-    # 4. 校验文件内容（Magic Number）
+    # 3. 校验文件内容（Magic Number），只读取文件头部，伪装文件在此直接拒绝
     if check_content:
-        # 读取文件头部（用于检查 Magic Number）
+        # 此处不重置读取位置，下一步 get_file_size 会 seek 到末尾再回到开头
         header = file.read(12)
-        file.seek(0)  # 重置到文件开头
         
         valid, error = validate_image_content(header)
         if not valid:
-            return False, error, file_size
+            file.seek(0)
+            return False, error, None
+    
+    # 4. 校验大小（结束后文件位于开头）
+    file_size = get_file_size(file)
     
-    logger.debug(f"文件校验通过: {filename}, 大小: {file_size} bytes")
+    valid, error = validate_image_size(file_size)
+    if not valid:
+        return False, error, file_size
+    
+    logger.debug("文件校验通过: %s, 大小: %s bytes", filename, file_size)
     return True, None, file_size
 
 
+# 文件名中需要替换为下划线的危险字符
+_FILENAME_SANITIZE_TABLE = str.maketrans({c: '_' for c in '/\\<>:"|?*\x00'})
+
+
 def sanitize_filename(filename: str) -> str:
     """
     清理文件名，移除危险字符
@@ -223,12 +249,14 @@ def sanitize_filename(filename: str) -> str:
         return "unnamed"
     
     # 获取文件名和扩展名
-    name, ext = os.path.splitext(filename)
+    dot = _ext_index(filename)
+    if dot >= 0:
+        name, ext = filename[:dot], filename[dot:]
+    else:
+        name, ext = filename, ''
     
-    # 移除路径分隔符和特殊字符
-    dangerous_chars = ['/', '\\', '..', '<', '>', ':', '"', '|', '?', '*', '\x00']
-    for char in dangerous_chars:
-        name = name.replace(char, '_')
+    # 移除路径分隔符和特殊字符（单字符一次 translate 完成，".." 为双字符单独替换）
+    name = name.translate(_FILENAME_SANITIZE_TABLE).replace('..', '_')
     
     # 限制文件名长度
     if len(name) > 100:
@@ -276,7 +304,7 @@ def validate_document_extension(filename: str) -> Tuple[bool, Optional[str], Opt
         return False, "文件名不能为空", None
     
     # 获取扩展名（去掉点号，转小写）
-    ext = os.path.splitext(filename)[1].lower().lstrip('.')
+    ext = get_extension(filename)
     
     if not ext:
         return False, "文件没有扩展名", None
@@ -363,17 +391,15 @@ def validate_document_file(
     
     filename = file.filename
     
-    logger.debug(f"开始校验文档: {filename}")
+    logger.debug("开始校验文档: %s", filename)
     
     # 1. 校验扩展名
     valid, error, file_type = validate_document_extension(filename)
     if not valid:
         return False, error, None, None
     
-    # 2. 读取文件内容并校验大小
-    file.seek(0, 2)  # 移到文件末尾
-    file_size = file.tell()  # 获取文件大小
-    file.seek(0)  # 重置到文件开头
+    # 2. 校验大小
+    file_size = get_file_size(file)
     
     valid, error = validate_document_size(file_size)
     if not valid:
@@ -388,5 +414,30 @@ def validate_document_file(
         if not valid:
             return False, error, file_size, file_type
     
-    logger.debug(f"文档校验通过: {filename}, 大小: {file_size} bytes, 类型: {file_type}")
+    logger.debug("文档校验通过: %s, 大小: %s bytes, 类型: %s", filename, file_size, file_type)
     return True, None, file_size, file_type
+
+
+# 计算文件哈希时每次读取的块大小（1MB）
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def compute_file_hash(file: FileStorage) -> str:
+    """
+    流式计算上传文件的 SHA-256 摘要
+
+    按块读取文件流，不会一次性把整个文件读入内存，计算完成后重置到文件开头
+
+    Args:
+        file: Werkzeug FileStorage 对象
+
+    Returns:
+        十六进制摘要字符串
+    """
+    stream = file.stream
+    stream.seek(0)
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(0)  # 重置到文件开头
+    return digest.hexdigest()
@@ -0,0 +1,12 @@
+"""
+ID 生成工具模块
+
+提供模型主键使用的 32 位十六进制 ID
+"""
+
+import os
+
+
+def generate_id() -> str:
+    """生成 32 位十六进制随机 ID（16 字节随机数的十六进制编码）"""
+    return os.urandom(16).hex()
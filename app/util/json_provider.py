@@ -0,0 +1,62 @@
+"""
+JSON 序列化模块
+
+使用 orjson 替换 Flask 默认的 JSON 编解码实现
+"""
+
+from types import MappingProxyType
+from typing import Any
+
+import orjson
+from flask import Response
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """基于 orjson 的 JSON Provider
+
+    jsonify/request.get_json 等均通过 app.json 编解码，
+    orjson 原生支持 datetime/dataclass/UUID，其余类型回退到 Flask 默认的 default 处理。
+    """
+
+    # 保留字典原有的键顺序，不做排序
+    sort_keys = False
+
+    @staticmethod
+    def default(o: Any) -> Any:
+        """orjson 不支持的类型：只读映射（如模型配置）转为字典，其余交给 Flask 默认处理"""
+        if isinstance(o, MappingProxyType):
+            return dict(o)
+        return DefaultJSONProvider.default(o)
+
+    # 基础序列化选项：支持 numpy 数组（向量检索结果）和非字符串键
+    OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """序列化为 JSON 字符串"""
+        return self._dumps_bytes(
+            obj, indent=kwargs.get('indent'), sort_keys=kwargs.get('sort_keys', self.sort_keys)
+        ).decode('utf-8')
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """序列化为 JSON 响应
+
+        直接使用 orjson 输出的字节作为响应体，省去 str 解码再编码的往返。
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent, sort_keys=self.sort_keys), mimetype=self.mimetype
+        )
+
+    def _dumps_bytes(self, obj: Any, indent: Any = None, sort_keys: bool = False) -> bytes:
+        option = self.OPTIONS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        """从 JSON 字符串或字节反序列化"""
+        return orjson.loads(s)
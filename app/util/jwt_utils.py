@@ -4,8 +4,9 @@ JWT 工具模块
 提供 JWT Token 的生成、验证和解析功能
 """
 
+import time
+
 import jwt
-from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any
 from flask import current_app
 
@@ -18,6 +19,24 @@ logger = get_logger(__name__)
 # Token 默认有效期（小时）
 DEFAULT_TOKEN_EXPIRE_HOURS = 24
 
+# 签名算法及解码参数（模块级常量，避免每次调用重新构建列表/字典；pyjwt 不会修改传入的参数）
+_ALGORITHM = "HS256"
+_ALGORITHMS = (_ALGORITHM,)
+_NO_VERIFY_OPTIONS = {"verify_signature": False}
+
+# 不会随时间恢复有效的验证失败类型：已过期、签名错误、格式错误（InvalidSignatureError 是 DecodeError 的子类）
+# 尚未生效（ImmatureSignatureError，时钟偏差或 nbf）等失败不在此列
+PERMANENT_TOKEN_ERRORS = (jwt.ExpiredSignatureError, jwt.DecodeError)
+
+def _get_secret_key() -> str:
+    """
+    获取当前应用的 JWT 签名密钥
+
+    每次从 current_app.config 读取（一次字典查找），不做进程级缓存：
+    同一进程中可能存在多个配置不同的应用（如测试配置），密钥必须跟随当前应用。
+    """
+    return current_app.config.get("SECRET_KEY", "dev-secret-key")
+
 
 def generate_token(
     user_id: str,
@@ -37,45 +56,52 @@ def generate_token(
     Returns:
         JWT Token 字符串
     """
-    now = datetime.now(timezone.utc)
+    # exp/iat 直接使用 Unix 时间戳（pyjwt 编码 datetime 时同样转换为整数秒）
+    now = int(time.time())
     
     payload = {
         "user_id": user_id,
         "username": username,
-        "exp": now + timedelta(hours=expires_hours),  # 过期时间
+        "exp": now + expires_hours * 3600,  # 过期时间
         "iat": now,  # 签发时间
         **extra_claims
     }
 
-    secret_key = current_app.config.get("SECRET_KEY", "dev-secret-key")
+    secret_key = _get_secret_key()
     
-    token = jwt.encode(payload, secret_key, algorithm="HS256")
+    token = jwt.encode(payload, secret_key, algorithm=_ALGORITHM)
     
-    logger.debug(f"为用户 {username} 生成 Token，有效期 {expires_hours} 小时")
+    logger.debug("为用户 %s 生成 Token，有效期 %s 小时", username, expires_hours)
     
     return token
 
 
-def verify_token(token: str) -> Optional[Dict[str, Any]]:
+def verify_token(token: str, raise_errors: bool = False) -> Optional[Dict[str, Any]]:
     """
     验证并解析 JWT Token
 
     Args:
         token: JWT Token 字符串
+        raise_errors: 为 True 时验证失败记录日志后重新抛出 jwt.InvalidTokenError 子类，
+            供调用方区分失败原因（如只缓存永久性失败）
 
     Returns:
         解析后的 payload 字典，验证失败返回 None
     """
-    secret_key = current_app.config.get("SECRET_KEY", "dev-secret-key")
+    secret_key = _get_secret_key()
     
     try:
-        payload = jwt.decode(token, secret_key, algorithms=["HS256"])
+        payload = jwt.decode(token, secret_key, algorithms=_ALGORITHMS)
         return payload
     except jwt.ExpiredSignatureError:
         logger.warning("Token 已过期")
+        if raise_errors:
+            raise
         return None
     except jwt.InvalidTokenError as e:
         logger.warning(f"Token 无效: {e}")
+        if raise_errors:
+            raise
         return None
 
 
@@ -95,12 +121,16 @@ def get_token_from_header() -> Optional[str]:
     if not auth_header:
         return None
     
-    parts = auth_header.split(" ")
+    # 只比较前缀（大小写不敏感），不拆分整个请求头，也不对整段 Token 做 lower()
+    if auth_header[:7].lower() != "bearer ":
+        return None
     
-    if len(parts) != 2 or parts[0].lower() != "bearer":
+    token = auth_header[7:]
+    # 与 "Bearer <token>" 严格两段的格式保持一致：Token 为空或含空格视为无效
+    if not token or " " in token:
         return None
     
-    return parts[1]
+    return token
 
 
 def decode_token_without_verify(token: str) -> Optional[Dict[str, Any]]:
@@ -114,7 +144,7 @@ def decode_token_without_verify(token: str) -> Optional[Dict[str, Any]]:
         解析后的 payload 字典
     """
     try:
-        payload = jwt.decode(token, options={"verify_signature": False})
+        payload = jwt.decode(token, options=_NO_VERIFY_OPTIONS)
         return payload
     except Exception:
         return None
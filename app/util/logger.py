@@ -3,18 +3,26 @@
 日志工具模块
 提供统一的日志配置和管理功能
 """
+# 导入 atexit，用于进程退出时停止日志监听线程
+import atexit
 # 导入标准库 logging，用于日志管理
 import logging
+# 导入 os，用于注册 fork 后的回调
+import os
+# 导入 queue，用于日志异步写入队列
+import queue
 # 导入 sys，用于标准输出流
 import sys
-# 导入 RotatingFileHandler，用于日志文件轮转
-from logging.handlers import RotatingFileHandler
+# 导入 RotatingFileHandler 用于日志文件轮转，QueueHandler/QueueListener 用于异步写入
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+# 导入 lru_cache，用于缓存按名称获取的日志记录器
+from functools import lru_cache
 # 导入 Path，用于文件/目录路径处理
 from pathlib import Path
 # 导入类型提示工具
 from typing import Optional
-# 导入应用配置类
-from app.config import Config
+# 导入应用配置类和功能开关
+from app.config import Config, FEATURES
 # 日志管理器类
 class LoggerManager:
     """日志管理器"""
@@ -25,22 +33,28 @@ class LoggerManager:
     MAX_BYTES = 10 * 1024 * 1024
     # 日志文件保留份数
     BACKUP_COUNT = 5
+    # 日志的后台监听线程（进程内唯一，重复初始化时先停止旧的）
+    _listener: Optional[QueueListener] = None
+    # 是否已注册进程退出时停止监听线程的回调
+    _atexit_registered = False
 
     def __init__(self):
         """初始化日志管理器"""
         self.log_dir = Path(Config.LOG_DIR)
         self.log_file = Config.LOG_FILE
         self.level = getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO)
-        self.enable_file = Config.LOG_ENABLE_FILE
-        self.enable_console = Config.LOG_ENABLE_CONSOLE
+        self.enable_file = FEATURES.log_file
+        self.enable_console = FEATURES.log_console
         # 初始化日志系统
         self._initialize()
 
     def _initialize(self):
         """初始化日志系统"""
+        # 停止之前的日志监听线程，防止重复初始化时产生多个写线程
+        self._stop_listener()
         # 如果启用文件日志则创建日志目录
-        if Config.LOG_ENABLE_FILE:
-            Path(Config.LOG_DIR).mkdir(parents=True, exist_ok=True)
+        if self.enable_file:
+            self.log_dir.mkdir(parents=True, exist_ok=True)
         # 获取根日志记录器
         root_logger = logging.getLogger()
         # 移除原有所有处理器，防止重复添加
@@ -49,7 +63,9 @@ class LoggerManager:
         root_logger.setLevel(self.level)
         # 创建日志格式器
         formatter = logging.Formatter(self.FORMAT_STRING)
-        # 如果启用控制台日志，则创建并添加控制台日志处理器
+        # 实际输出日志的处理器，统一由后台监听线程调用
+        handlers = []
+        # 如果启用控制台日志，则创建控制台日志处理器
         if self.enable_console:
             # 创建控制台日志处理器
             console_handler = logging.StreamHandler(sys.stdout)
@@ -57,8 +73,7 @@ class LoggerManager:
             console_handler.setLevel(self.level)
             # 设置日志格式
             console_handler.setFormatter(formatter)
-            # 添加控制台日志处理器到根日志记录器
-            root_logger.addHandler(console_handler)
+            handlers.append(console_handler)
 
         # 如果启用文件日志，则创建文件日志处理器，支持轮转
         if self.enable_file:
@@ -79,12 +94,54 @@ class LoggerManager:
             file_handler.setLevel(self.level)
             # 设置日志格式
             file_handler.setFormatter(formatter)
-            # 添加文件日志处理器到根日志记录器
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        if handlers:
+            # 请求线程只把日志记录放入队列，由后台监听线程负责写控制台和文件
+            log_queue = queue.SimpleQueue()
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setLevel(self.level)
+            # 添加队列日志处理器到根日志记录器
+            root_logger.addHandler(queue_handler)
+            # 启动后台监听线程，独占输出流和文件句柄
+            listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            listener.start()
+            LoggerManager._listener = listener
+            # 进程退出时写完队列中剩余的日志（监听线程为守护线程，不停止会丢失尾部日志）
+            if not LoggerManager._atexit_registered:
+                atexit.register(LoggerManager._stop_listener)
+                LoggerManager._atexit_registered = True
+
+        # 非调试模式下，日志处理异常不输出堆栈到 stderr
+        if not FEATURES.debug:
+            logging.raiseExceptions = False
 
         # 捕获 warnings 模块的警告作为日志
         logging.captureWarnings(True)
 
+    @classmethod
+    def _stop_listener(cls):
+        """停止日志监听线程，写完队列中剩余的日志并关闭处理器"""
+        listener = cls._listener
+        if listener is None:
+            return
+        cls._listener = None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+    @classmethod
+    def _restart_listener_after_fork(cls):
+        """fork 出的子进程（如 gunicorn --preload 的 worker）中不存在父进程的监听线程，重新启动一个"""
+        listener = cls._listener
+        if listener is None:
+            return
+        new_listener = QueueListener(
+            listener.queue, *listener.handlers, respect_handler_level=listener.respect_handler_level
+        )
+        new_listener.start()
+        cls._listener = new_listener
+
     # 获取日志记录器
     def get_logger(self, name: Optional[str] = None) -> logging.Logger:
         """
@@ -105,7 +162,10 @@ class LoggerManager:
 
 # 在模块级别创建 LoggerManager 实例并初始化
 logger_manager = LoggerManager()
-# 获取日志记录器
+# 子进程中重启日志监听线程，否则 worker 写入队列的日志无人消费
+os.register_at_fork(after_in_child=LoggerManager._restart_listener_after_fork)
+# 获取日志记录器（同名记录器始终是同一对象，缓存后不再每次获取 logging 模块锁）
+@lru_cache(maxsize=None)
 def get_logger(name: Optional[str] = None) -> logging.Logger:
     """
     获取日志记录器
@@ -2,10 +2,26 @@
 模型配置模块
 
 定义可用的 Embedding 模型和 LLM 模型列表
+
+配置在导入时冻结为只读结构（字典为 MappingProxyType，列表为 tuple），
+防止运行期被意外修改；gunicorn --preload 时各 worker 共享同一份只读对象。
 """
 
+from types import MappingProxyType
+from typing import Any
+
+
+def _freeze(value: Any) -> Any:
+    """递归地将字典转为只读映射、列表转为元组"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
 # 定义向量嵌入模型（Embedding Models）的配置字典
-EMBEDDING_MODELS = {
+EMBEDDING_MODELS = _freeze({
     # HuggingFace 嵌入模型
     "huggingface": {
         "name": "HuggingFace Embeddings",
@@ -71,10 +87,10 @@ EMBEDDING_MODELS = {
         "requires_api_key": False,
         "requires_base_url": True,
     },
-}
+})
 
 # 定义 LLM（大模型，推理/对话模型）配置字典
-LLM_MODELS = {
+LLM_MODELS = _freeze({
     # DeepSeek 模型配置
     "deepseek": {
         "name": "DeepSeek",
@@ -110,4 +126,25 @@ LLM_MODELS = {
         "requires_api_key": False,
         "requires_base_url": True,
     },
-}
+})
+
+
+def _build_model_index(catalog: Any, keys: tuple) -> MappingProxyType:
+    """
+    构建 (提供商, 模型标识) -> 模型配置 的查找索引
+
+    每个模型按 keys 中的字段（如 name、path）分别建立索引；
+    多个模型标识相同时保留列表中靠前的模型，与顺序遍历查找的结果一致。
+    """
+    index = {}
+    for provider, provider_config in catalog.items():
+        for model in provider_config.get("models", ()):
+            for key in keys:
+                value = model.get(key)
+                if value:
+                    index.setdefault((provider, value), model)
+    return MappingProxyType(index)
+
+
+# 按 (提供商, 模型名称或路径) 直接查找模型配置，避免遍历各提供商的模型列表
+EMBEDDING_MODEL_INDEX = _build_model_index(EMBEDDING_MODELS, ("path", "name"))
@@ -0,0 +1,43 @@
+"""
+分页工具模块
+
+提供基于 (created_at, id) 的游标编解码，用于 keyset 分页
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+
+
+def encode_cursor(created_at: datetime, record_id: str) -> str:
+    """
+    把最后一条记录的排序键编码为不透明游标
+
+    Args:
+        created_at: 记录创建时间
+        record_id: 记录 ID
+
+    Returns:
+        URL 安全的 base64 字符串
+    """
+    payload = json.dumps([created_at.isoformat(), record_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, str]]:
+    """
+    解码游标
+
+    Args:
+        cursor: encode_cursor 生成的游标
+
+    Returns:
+        (created_at, id)，游标无效时返回 None
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), str(record_id)
+    except (ValueError, TypeError):
+        return None
@@ -21,14 +21,10 @@ def success(data: Any = None, message: str = "success", code: int = 200, **kwarg
     Returns:
         Flask Response 对象
     """
-    response = {
-        "code": code,
-        "message": message,
-        "data": data
-    }
-    # 合并额外字段（如 token）
-    response.update(kwargs)
-    return jsonify(response), code
+    if kwargs:
+        # 合并额外字段（如 token），一次构建完整字典
+        return jsonify({"code": code, "message": message, "data": data, **kwargs}), code
+    return jsonify({"code": code, "message": message, "data": data}), code
 
 
 def error(message: str = "error", code: int = 400, data: Any = None):
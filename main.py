@@ -2,7 +2,7 @@
 RAG Lite - 应用入口
 """
 from app import create_app
-from app.config import Config
+from app.config import Config, FEATURES
 from app.util.logger import get_logger
 logger = get_logger(__name__)
 
@@ -14,7 +14,7 @@ app = create_app()
 def main():
     """启动开发服务器"""
     logger.info(f"Starting  RAG Lite server on {Config.APP_HOST}:{Config.APP_PORT}")
-    app.run(host=Config.APP_HOST, port=Config.APP_PORT, debug=Config.APP_DEBUG)
+    app.run(host=Config.APP_HOST, port=Config.APP_PORT, debug=FEATURES.debug)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,47 @@
+"""
+知识库请求参数测试
+"""
+
+from app.dto.kb import KbCreateDTO, parse_update
+
+
+class TestKbCreateDTO:
+    """创建参数解析测试"""
+
+    def test_valid(self):
+        """合法参数会被清理后构建 DTO"""
+        dto, error = KbCreateDTO.from_json({
+            "name": " 知识库 ",
+            "description": "  ",
+            "chunk_size": 500,
+            "chunk_overlap": 50,
+        })
+
+        assert error is None
+        assert dto.name == "知识库"
+        assert dto.description is None
+
+    def test_invalid(self):
+        """缺失或越界的字段返回对应错误"""
+        assert KbCreateDTO.from_json({"name": None})[1] == "知识库名称不能为空"
+        assert KbCreateDTO.from_json({"name": "a", "chunk_size": True})[1] == "分块大小应为 100-2000 之间的整数"
+        assert KbCreateDTO.from_json(
+            {"name": "a", "chunk_size": 150, "chunk_overlap": 150}
+        )[1] == "分块重叠大小不能大于等于分块大小"
+
+
+class TestParseUpdate:
+    """更新参数解析测试"""
+
+    def test_only_present_fields(self):
+        """只收集请求中出现且允许更新的字段"""
+        update_data, error = parse_update({"description": "", "cover_image": "k", "user_id": "x"})
+
+        assert error is None
+        assert update_data == {"description": None, "cover_image": "k"}
+
+    def test_cross_field(self):
+        """同时更新分块参数时校验两者关系"""
+        _, error = parse_update({"chunk_size": 150, "chunk_overlap": 150})
+
+        assert error == "分块重叠大小不能大于等于分块大小"
@@ -0,0 +1,97 @@
+"""
+本地存储测试
+"""
+
+import io
+import os
+from tempfile import SpooledTemporaryFile
+from unittest.mock import patch
+
+import pytest
+
+from app.services.storage import local_storage
+from app.services.storage.local_storage import COPY_BUFFER_SIZE, _copy_stream
+
+# 超过一个复制缓冲区，会尝试内核复制
+LARGE_DATA = os.urandom(COPY_BUFFER_SIZE * 2 + 123)
+SMALL_DATA = os.urandom(1000)
+
+
+def _rolled_stream(data):
+    stream = SpooledTemporaryFile(max_size=1024, mode="rb+")
+    stream.write(data)
+    stream.seek(0)
+    return stream
+
+
+def _copy(src, tmp_path, file_size):
+    dst_path = tmp_path / "dst"
+    with open(dst_path, "wb") as dst:
+        _copy_stream(src, dst, file_size)
+    return dst_path.read_bytes()
+
+
+@pytest.fixture
+def copy_file_range_spy():
+    if not hasattr(os, "copy_file_range"):
+        pytest.skip("当前平台没有 os.copy_file_range")
+    with patch.object(local_storage.os, "copy_file_range", wraps=os.copy_file_range) as spy:
+        yield spy
+
+
+class TestCopyStream:
+    """上传流写入测试"""
+
+    def test_rolled_stream_uses_kernel_copy(self, tmp_path, copy_file_range_spy):
+        """已落盘的上传流通过 copy_file_range 复制"""
+        with _rolled_stream(LARGE_DATA) as src:
+            assert _copy(src, tmp_path, len(LARGE_DATA)) == LARGE_DATA
+
+        assert copy_file_range_spy.called
+
+    def test_in_memory_spooled_stream_not_rolled(self, tmp_path, copy_file_range_spy):
+        """留在内存中的小文件直接缓冲复制，不会被强制写入临时文件"""
+        with SpooledTemporaryFile(max_size=1024 * 500, mode="rb+") as src:
+            src.write(SMALL_DATA)
+            src.seek(0)
+            with patch.object(SpooledTemporaryFile, "rollover") as mock_rollover:
+                assert _copy(src, tmp_path, len(SMALL_DATA)) == SMALL_DATA
+
+        mock_rollover.assert_not_called()
+        copy_file_range_spy.assert_not_called()
+
+    def test_memory_stream_falls_back(self, tmp_path, copy_file_range_spy):
+        """没有文件描述符的内存流使用缓冲复制"""
+        assert _copy(io.BytesIO(LARGE_DATA), tmp_path, len(LARGE_DATA)) == LARGE_DATA
+        copy_file_range_spy.assert_not_called()
+
+    def test_nonzero_offset(self, tmp_path, copy_file_range_spy):
+        """从流的当前位置开始复制"""
+        with _rolled_stream(LARGE_DATA) as src:
+            src.seek(100)
+            assert _copy(src, tmp_path, len(LARGE_DATA)) == LARGE_DATA[100:]
+
+        assert copy_file_range_spy.call_args.kwargs["offset_src"] == 100
+
+    def test_fallback_when_kernel_copy_fails(self, tmp_path):
+        """copy_file_range 报错时从已复制的位置继续缓冲复制"""
+        calls = []
+
+        def flaky_copy(src_fd, dst_fd, count, offset_src):
+            calls.append(offset_src)
+            if len(calls) > 1:
+                raise OSError(18, "Invalid cross-device link")
+            os.lseek(dst_fd, 0, os.SEEK_END)
+            return os.write(dst_fd, LARGE_DATA[offset_src:offset_src + COPY_BUFFER_SIZE])
+
+        with patch.object(local_storage.os, "copy_file_range", flaky_copy, create=True):
+            with _rolled_stream(LARGE_DATA) as src:
+                assert _copy(src, tmp_path, len(LARGE_DATA)) == LARGE_DATA
+
+        assert calls == [0, COPY_BUFFER_SIZE]
+
+    def test_fallback_without_copy_file_range(self, tmp_path, monkeypatch):
+        """平台没有 copy_file_range 时使用缓冲复制"""
+        monkeypatch.delattr(local_storage.os, "copy_file_range", raising=False)
+        with _rolled_stream(LARGE_DATA) as src:
+            assert _copy(src, tmp_path, len(LARGE_DATA)) == LARGE_DATA
@@ -0,0 +1,39 @@
+"""
+知识库归属缓存测试
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.services import auth_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    auth_cache._cache.clear()
+    yield
+    auth_cache._cache.clear()
+
+
+class TestKbOwnedBy:
+    """归属校验缓存测试"""
+
+    def test_cache_hit_skips_query(self):
+        """同一知识库和用户第二次校验直接命中缓存"""
+        with patch('app.services.auth_cache._query_owned', return_value=True) as mock_query:
+            assert auth_cache.kb_owned_by('kb1', 'u1', session=object())
+            assert auth_cache.kb_owned_by('kb1', 'u1', session=object())
+
+        assert mock_query.call_count == 1
+
+    def test_invalidate_kb(self):
+        """知识库失效后重新查询，不影响其他知识库的缓存"""
+        with patch('app.services.auth_cache._query_owned', side_effect=[True, True, False]) as mock_query:
+            assert auth_cache.kb_owned_by('kb1', 'u1', session=object())
+            assert auth_cache.kb_owned_by('kb2', 'u1', session=object())
+            auth_cache.invalidate_kb('kb1', 'u1')
+            assert not auth_cache.kb_owned_by('kb1', 'u1', session=object())
+            assert auth_cache.kb_owned_by('kb2', 'u1', session=object())
+
+        assert mock_query.call_count == 3
@@ -0,0 +1,144 @@
+"""
+存储文件清理测试
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, OrphanFile
+from app.services import file_cleanup
+
+
+class _FakeStorage:
+    """按预设结果删除的存储"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    def delete_many(self, object_keys):
+        self.calls.append(list(object_keys))
+        failed_keys = [key for key in object_keys if key in self.failing]
+        return failed_keys, ("删除失败" if failed_keys else None)
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def scope():
+        session = factory()
+        try:
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    with patch('app.services.file_cleanup.session_scope', scope):
+        yield factory
+    engine.dispose()
+
+
+def _add_orphans(session_factory, object_keys, created_at=None):
+    created_at = created_at or datetime.now() - timedelta(hours=1)
+    with session_factory() as session:
+        session.add_all(OrphanFile(object_key=key, created_at=created_at) for key in object_keys)
+        session.commit()
+
+
+def _records(session_factory):
+    with session_factory() as session:
+        return {
+            record.object_key: record
+            for record in session.execute(select(OrphanFile)).scalars()
+        }
+
+
+def _use_storage(storage):
+    return patch('app.services.file_cleanup.get_storage_provider', return_value=storage)
+
+
+class TestDeleteFiles:
+    """逐个文件处理删除结果测试"""
+
+    def test_partial_failure(self, session_factory):
+        """成功的文件移除登记，失败的文件保留登记并设置重试时间"""
+        _add_orphans(session_factory, ['a', 'b', 'c'])
+
+        with _use_storage(_FakeStorage(failing={'b'})):
+            assert file_cleanup.delete_files(['a', 'b', 'c']) == 2
+
+        records = _records(session_factory)
+        assert set(records) == {'b'}
+        assert records['b'].attempts == 1
+        assert records['b'].next_attempt_at > datetime.now()
+
+    def test_storage_exception_keeps_all(self, session_factory):
+        """存储异常时全部保留登记并累计失败次数"""
+        _add_orphans(session_factory, ['a', 'b'])
+
+        with patch('app.services.file_cleanup.get_storage_provider', side_effect=RuntimeError('down')):
+            assert file_cleanup.delete_files(['a', 'b']) == 0
+
+        records = _records(session_factory)
+        assert {key: record.attempts for key, record in records.items()} == {'a': 1, 'b': 1}
+
+    def test_backoff_grows_and_is_capped(self):
+        """退避时间随失败次数翻倍，不超过上限"""
+        assert file_cleanup._retry_backoff(1) == file_cleanup.RETRY_BACKOFF_BASE
+        assert file_cleanup._retry_backoff(2) == file_cleanup.RETRY_BACKOFF_BASE * 2
+        assert file_cleanup._retry_backoff(30) == file_cleanup.RETRY_BACKOFF_MAX
+
+
+class TestSweepOrphanFiles:
+    """待清理文件重试测试"""
+
+    def test_failing_keys_do_not_block_batch(self, session_factory, monkeypatch):
+        """持续失败的文件进入退避，下一批处理其后的文件"""
+        monkeypatch.setattr(file_cleanup, 'SWEEP_BATCH_SIZE', 2)
+        base = datetime.now() - timedelta(hours=1)
+        _add_orphans(session_factory, ['bad1', 'bad2'], created_at=base)
+        _add_orphans(session_factory, ['good'], created_at=base + timedelta(minutes=1))
+
+        storage = _FakeStorage(failing={'bad1', 'bad2'})
+        with _use_storage(storage):
+            assert file_cleanup.sweep_orphan_files() == 0
+            assert file_cleanup.sweep_orphan_files() == 1
+
+        assert storage.calls == [['bad1', 'bad2'], ['good']]
+        assert set(_records(session_factory)) == {'bad1', 'bad2'}
+
+    def test_retries_after_backoff(self, session_factory):
+        """退避时间已过的文件会再次重试"""
+        _add_orphans(session_factory, ['a'])
+        with session_factory() as session:
+            record = session.execute(select(OrphanFile)).scalar_one()
+            record.attempts = 3
+            record.next_attempt_at = datetime.now() - timedelta(seconds=1)
+            session.commit()
+
+        with _use_storage(_FakeStorage()):
+            assert file_cleanup.sweep_orphan_files() == 1
+
+        assert _records(session_factory) == {}
+
+    def test_skips_recent_records(self, session_factory):
+        """刚登记的文件留给后台删除任务，不重复处理"""
+        _add_orphans(session_factory, ['a'], created_at=datetime.now())
+
+        storage = _FakeStorage()
+        with _use_storage(storage):
+            assert file_cleanup.sweep_orphan_files() == 0
+
+        assert storage.calls == []
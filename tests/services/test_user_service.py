@@ -0,0 +1,32 @@
+"""
+用户服务测试
+"""
+
+from unittest.mock import patch
+
+import bcrypt
+import pytest
+
+from app.services.user_service import user_service
+
+
+@pytest.fixture
+def bcrypt_hash():
+    return bcrypt.hashpw(b"secret", bcrypt.gensalt(rounds=4)).decode("utf-8")
+
+
+class TestVerifyPassword:
+    """密码验证测试"""
+
+    def test_correct_and_wrong_password(self, bcrypt_hash):
+        """正确密码通过，错误密码失败"""
+        assert user_service.verify_password("secret", bcrypt_hash)
+        assert not user_service.verify_password("wrong", bcrypt_hash)
+
+    def test_malformed_hash_skips_bcrypt(self):
+        """格式不合法的哈希直接返回失败"""
+        with patch('app.services.user_service.bcrypt.checkpw') as mock_checkpw:
+            assert not user_service.verify_password("secret", "plain-text")
+            assert not user_service.verify_password("secret", "$2b$10$short")
+
+        mock_checkpw.assert_not_called()
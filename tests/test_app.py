@@ -0,0 +1,78 @@
+"""
+应用工厂测试
+
+测试 CORS 处理与蓝图注册
+"""
+
+import pytest
+
+
+@pytest.fixture
+def client():
+    """创建测试客户端"""
+    from app import create_app
+    app = create_app()
+    app.config['TESTING'] = True
+    with app.test_client() as client:
+        yield client
+
+
+class TestCors:
+    """CORS 跨域处理测试"""
+
+    def test_preflight_allowed_origin(self, client):
+        """允许的源发起预检请求返回 204 及 CORS 头"""
+        response = client.options('/api/health', headers={
+            'Origin': 'http://localhost:5173',
+            'Access-Control-Request-Method': 'POST',
+        })
+
+        assert response.status_code == 204
+        assert response.headers['Access-Control-Allow-Origin'] == 'http://localhost:5173'
+        assert 'POST' in response.headers['Access-Control-Allow-Methods']
+        assert 'Authorization' in response.headers['Access-Control-Allow-Headers']
+        assert response.headers['Access-Control-Max-Age'] == '600'
+
+    def test_simple_request_allowed_origin(self, client):
+        """允许的源发起普通请求时补充 CORS 头"""
+        response = client.get('/api/health', headers={'Origin': 'http://127.0.0.1:3000'})
+
+        assert response.status_code == 200
+        assert response.headers['Access-Control-Allow-Origin'] == 'http://127.0.0.1:3000'
+        assert 'X-Total-Count' in response.headers['Access-Control-Expose-Headers']
+
+    def test_disallowed_origin(self, client):
+        """未允许的源不返回 CORS 头"""
+        response = client.get('/api/health', headers={'Origin': 'http://evil.example.com'})
+
+        assert response.status_code == 200
+        assert 'Access-Control-Allow-Origin' not in response.headers
+
+
+class TestBlueprintRegistration:
+    """蓝图注册测试"""
+
+    def test_blueprints_registered_eagerly_by_default(self, client):
+        """默认在应用创建时注册全部蓝图，处理请求期间不修改路由表"""
+        app = client.application
+        assert 'settings' in app.blueprints
+        assert 'kb' in app.blueprints
+
+    def test_lazy_blueprint_registered_on_first_request(self):
+        """开启 LAZY_LOAD_BLUEPRINTS 时首次访问前缀才注册对应蓝图"""
+        from app import create_app
+        from app.config import Config
+
+        class LazyConfig(Config):
+            LAZY_LOAD_BLUEPRINTS = True
+
+        app = create_app(LazyConfig)
+        app.config['TESTING'] = True
+        client = app.test_client()
+        assert 'settings' not in app.blueprints
+
+        client.get('/api/health')
+        response = client.get('/api/settings/models')
+
+        assert 'settings' in app.blueprints
+        assert response.status_code == 401
@@ -0,0 +1 @@
+# Util tests package
@@ -0,0 +1,138 @@
+"""
+认证工具测试
+"""
+
+import time
+from unittest.mock import patch
+
+import jwt
+import pytest
+
+from app.util import auth
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    auth._token_cache.clear()
+    auth._rejected_token_cache.clear()
+    yield
+    auth._token_cache.clear()
+    auth._rejected_token_cache.clear()
+
+
+def _make_app(secret_key):
+    from flask import Flask
+
+    app = Flask('test_auth')
+    app.config['SECRET_KEY'] = secret_key
+    return app
+
+
+class TestVerifyTokenCached:
+    """Token 验证缓存测试"""
+
+    @pytest.fixture(autouse=True)
+    def app_context(self):
+        with _make_app('test-secret-key-a-0123456789abcdef').app_context():
+            yield
+
+    def test_cache_hit_skips_verify(self):
+        """剩余有效期充足的 Token 第二次验证直接命中缓存"""
+        payload = {'user_id': 'u1', 'exp': int(time.time()) + 3600}
+        with patch('app.util.auth.verify_token', return_value=payload) as mock_verify:
+            assert auth._verify_token_cached('t') == payload
+            assert auth._verify_token_cached('t') == payload
+
+        assert mock_verify.call_count == 1
+
+    def test_cache_hit_returns_copy(self):
+        """调用方修改返回的 payload 不影响缓存"""
+        payload = {'user_id': 'u1', 'exp': int(time.time()) + 3600}
+        with patch('app.util.auth.verify_token', return_value=payload):
+            auth._verify_token_cached('t')['user_id'] = 'tampered'
+            auth._verify_token_cached('t')['user_id'] = 'tampered'
+            assert auth._verify_token_cached('t')['user_id'] == 'u1'
+
+    def test_near_expiry_not_cached(self):
+        """即将过期的 Token 不写入缓存"""
+        payload = {'user_id': 'u1', 'exp': int(time.time()) + 10}
+        with patch('app.util.auth.verify_token', return_value=payload) as mock_verify:
+            auth._verify_token_cached('t')
+            auth._verify_token_cached('t')
+
+        assert mock_verify.call_count == 2
+
+    @pytest.mark.parametrize('error', [
+        jwt.ExpiredSignatureError('expired'),
+        jwt.InvalidSignatureError('bad signature'),
+        jwt.DecodeError('malformed'),
+    ])
+    def test_permanent_failure_cached(self, error):
+        """永久性验证失败的 Token 再次提交时直接拒绝，不再校验签名"""
+        with patch('app.util.auth.verify_token', side_effect=error) as mock_verify:
+            assert auth._verify_token_cached('t') is None
+            assert auth._verify_token_cached('t') is None
+
+        assert mock_verify.call_count == 1
+
+    def test_immature_token_valid_later(self):
+        """尚未生效的 Token 不写入拒绝缓存，生效后再次验证通过"""
+        payload = {'user_id': 'u1', 'exp': int(time.time()) + 3600}
+        side_effect = [jwt.ImmatureSignatureError('not yet valid'), payload]
+        with patch('app.util.auth.verify_token', side_effect=side_effect) as mock_verify:
+            assert auth._verify_token_cached('t') is None
+            assert auth._verify_token_cached('t') == payload
+
+        assert mock_verify.call_count == 2
+
+
+class TestSecretKeyPerApp:
+    """JWT 签名密钥跟随当前应用测试"""
+
+    def test_two_apps_use_own_keys(self):
+        """两个密钥不同的应用各自签发/验证，互不通用"""
+        from flask import Flask
+
+        from app.util.jwt_utils import generate_token, verify_token
+
+        app_a = Flask('app_a')
+        app_a.config['SECRET_KEY'] = 'test-secret-key-a-0123456789abcdef'
+        app_b = Flask('app_b')
+        app_b.config['SECRET_KEY'] = 'test-secret-key-b-0123456789abcdef'
+
+        with app_a.app_context():
+            token_a = generate_token('u1', 'alice')
+            assert verify_token(token_a)['user_id'] == 'u1'
+        with app_b.app_context():
+            token_b = generate_token('u2', 'bob')
+            assert verify_token(token_b)['user_id'] == 'u2'
+            assert verify_token(token_a) is None
+        with app_a.app_context():
+            assert verify_token(token_b) is None
+
+    def test_cache_not_shared_between_apps(self):
+        """应用 A 缓存的验证结果不会被密钥不同的应用 B 命中"""
+        from app.util.jwt_utils import generate_token
+
+        app_a = _make_app('test-secret-key-a-0123456789abcdef')
+        app_b = _make_app('test-secret-key-b-0123456789abcdef')
+
+        with app_a.app_context():
+            token_a = generate_token('u1', 'alice')
+            assert auth._verify_token_cached(token_a)['user_id'] == 'u1'
+        with app_b.app_context():
+            assert auth._verify_token_cached(token_a) is None
+
+    def test_rejection_not_shared_between_apps(self):
+        """应用 B 拒绝的 Token 不会导致签发它的应用 A 也拒绝"""
+        from app.util.jwt_utils import generate_token
+
+        app_a = _make_app('test-secret-key-a-0123456789abcdef')
+        app_b = _make_app('test-secret-key-b-0123456789abcdef')
+
+        with app_a.app_context():
+            token_a = generate_token('u1', 'alice')
+        with app_b.app_context():
+            assert auth._verify_token_cached(token_a) is None
+        with app_a.app_context():
+            assert auth._verify_token_cached(token_a)['user_id'] == 'u1'
@@ -0,0 +1,103 @@
+"""
+数据库工具测试
+"""
+
+import threading
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Base, Document
+from app.util import db
+from app.util.db import is_duplicate_key, upgrade_schema
+
+
+def _integrity_error(orig):
+    return IntegrityError("INSERT ...", {}, orig)
+
+
+class _PgError(Exception):
+    pgcode = "23505"
+
+
+class TestIsDuplicateKey:
+    """唯一约束冲突判断测试"""
+
+    def test_mysql_dup_entry(self):
+        """MySQL 1062 视为唯一约束冲突"""
+        orig = Exception(1062, "Duplicate entry 'a' for key 'knowledgebase.name'")
+        assert is_duplicate_key(_integrity_error(orig))
+
+    def test_mysql_foreign_key(self):
+        """外键约束错误不视为唯一约束冲突，即使信息中包含 name"""
+        orig = Exception(1452, "Cannot add or update a child row: ... (`name`)")
+        assert not is_duplicate_key(_integrity_error(orig))
+
+    def test_postgres_unique_violation(self):
+        """PostgreSQL 23505 视为唯一约束冲突"""
+        assert is_duplicate_key(_integrity_error(_PgError()))
+
+
+class TestUpgradeSchema:
+    """已有库结构升级测试"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite://")
+        Base.metadata.create_all(bind=engine)
+        # 模拟升级前的旧库：document 表没有 file_hash 列及其索引
+        with engine.begin() as conn:
+            conn.execute(text("DROP INDEX ix_document_kb_id_file_hash"))
+            conn.execute(text("ALTER TABLE document DROP COLUMN file_hash"))
+        yield engine
+        engine.dispose()
+
+    def test_adds_missing_column_and_index(self, engine):
+        """补齐缺失的可空列和索引，之后可正常查询"""
+        applied = upgrade_schema(engine)
+
+        assert applied == ["document.file_hash", "ix_document_kb_id_file_hash"]
+        inspector = inspect(engine)
+        assert "file_hash" in {c["name"] for c in inspector.get_columns("document")}
+        assert "ix_document_kb_id_file_hash" in {i["name"] for i in inspector.get_indexes("document")}
+        with engine.connect() as conn:
+            conn.execute(select(Document.id).where(Document.file_hash == "x")).all()
+
+    def test_idempotent(self, engine):
+        """重复执行不做任何变更"""
+        upgrade_schema(engine)
+
+        assert upgrade_schema(engine) == []
+
+
+class TestEnsureDbReady:
+    """数据库延迟初始化测试"""
+
+    @pytest.fixture(autouse=True)
+    def reset_state(self, monkeypatch):
+        monkeypatch.setattr(db, "_db_ready", threading.Event())
+        monkeypatch.setattr(db, "_db_last_attempt", None)
+        monkeypatch.setattr(db, "_DB_RETRY_INTERVAL", 0)
+        monkeypatch.setattr(db.db_manager, "_engine", object())
+
+    def test_failure_is_retried(self):
+        """初始化失败不标记就绪，下次调用重试，成功后不再执行"""
+        with patch("app.util.db.create_tables", side_effect=[RuntimeError("down"), None]) as mock_create:
+            db.ensure_db_ready()
+            assert not db._db_ready.is_set()
+            db.ensure_db_ready()
+            assert db._db_ready.is_set()
+            db.ensure_db_ready()
+
+        assert mock_create.call_count == 2
+
+    def test_retry_interval(self, monkeypatch):
+        """失败后在重试间隔内不重复初始化"""
+        monkeypatch.setattr(db, "_DB_RETRY_INTERVAL", 60)
+        with patch("app.util.db.create_tables", side_effect=RuntimeError("down")) as mock_create:
+            db.ensure_db_ready()
+            db.ensure_db_ready()
+
+        assert mock_create.call_count == 1
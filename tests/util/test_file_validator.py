@@ -0,0 +1,48 @@
+"""
+文件校验工具测试
+"""
+
+import pytest
+
+from app.util.file_validator import sanitize_filename, validate_image_content
+
+
+class TestValidateImageContent:
+    """图片 Magic Number 校验测试"""
+
+    @pytest.mark.parametrize('header', [
+        b'\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01',
+        b'\x89PNG\r\n\x1a\n\x00\x00\x00\x0d',
+        b'GIF87a\x01\x00\x01\x00\x00\x00',
+        b'GIF89a\x01\x00\x01\x00\x00\x00',
+        b'RIFF\x24\x00\x00\x00WEBP',
+    ])
+    def test_valid_images(self, header):
+        """各图片格式的合法文件头校验通过"""
+        assert validate_image_content(header) == (True, None)
+
+    @pytest.mark.parametrize('header', [
+        b'\x89PNx\r\n\x1a\n\x00\x00\x00\x0d',
+        b'GIF88a\x01\x00\x01\x00\x00\x00',
+        b'RIFF\x24\x00\x00\x00WAVE',
+        b'RIFF\x24\x00\x00\x00WEB',
+        b'%PDF-1.4\n%\xe2\xe3',
+    ])
+    def test_invalid_images(self, header):
+        """前缀相近但不完整的文件头校验失败"""
+        valid, error = validate_image_content(header)
+        assert not valid
+        assert error
+
+
+class TestSanitizeFilename:
+    """文件名清理测试"""
+
+    def test_dangerous_chars_replaced(self):
+        """路径分隔符、特殊字符和 .. 均替换为下划线，扩展名转小写"""
+        assert sanitize_filename('../../etc/pa<ss>wd.TXT') == '____etc_pa_ss_wd.txt'
+
+    def test_empty_name(self):
+        """清理后为空的文件名使用默认名"""
+        assert sanitize_filename('') == 'unnamed'
+        assert sanitize_filename('?.pdf') == 'unnamed.pdf'
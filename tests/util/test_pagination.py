@@ -0,0 +1,25 @@
+"""
+分页游标工具测试
+"""
+
+from datetime import datetime
+
+from app.util.pagination import encode_cursor, decode_cursor
+
+
+class TestCursor:
+    """游标编解码测试"""
+
+    def test_round_trip(self):
+        """编码后可还原排序键"""
+        created_at = datetime(2024, 5, 1, 12, 30, 45)
+        cursor = encode_cursor(created_at, 'a' * 32)
+
+        assert '=' not in cursor
+        assert decode_cursor(cursor) == (created_at, 'a' * 32)
+
+    def test_invalid_cursor(self):
+        """非法游标返回 None"""
+        assert decode_cursor('not-a-cursor!') is None
+        assert decode_cursor('bm90anNvbg') is None
+        assert decode_cursor('') is None
@@ -0,0 +1,41 @@
+"""
+TTL 缓存测试
+"""
+
+from unittest.mock import patch
+
+from app.util.ttl_cache import TTLCache
+
+
+class TestTTLCache:
+    """TTL 缓存测试"""
+
+    def test_expire(self):
+        """过期后返回默认值"""
+        cache = TTLCache(ttl=30)
+        with patch('app.util.ttl_cache.time.monotonic', return_value=100.0):
+            cache.set('k', False)
+            assert cache.get('k') is False
+        with patch('app.util.ttl_cache.time.monotonic', return_value=130.0):
+            assert cache.get('k', 'miss') == 'miss'
+
+    def test_lru_eviction(self):
+        """超出容量时淘汰最久未使用的条目"""
+        cache = TTLCache(ttl=30, maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+
+        assert cache.get('a') == 1
+        assert cache.get('b') is None
+        assert cache.get('c') == 3
+
+    def test_pop(self):
+        """pop 使缓存失效"""
+        cache = TTLCache(ttl=30)
+        cache.set('k', 1)
+        cache.pop('k')
+        cache.pop('missing')
+
+        assert cache.get('k') is None
@@ -0,0 +1,11 @@
+"""
+RAG Lite - WSGI 入口
+
+供生产环境的 WSGI 服务器加载，例如：
+    gunicorn -w $((2 * $(nproc) + 1)) -k gthread --threads 4 --preload wsgi:app
+"""
+from app import create_app
+
+
+# 创建应用实例
+app = create_app()